@@ -59,6 +59,10 @@ def process_all_crawler_data(base_dir=None, banner_data_dir=None, max_workers=4)
     storage_analyzer = StorageAnalyzer(verbose=False)
 
     def run_all_analyzers(folder_path):
+        # Classify cookies for all profiles at once so unknown cookies are looked up only once
+        tqdm.write("Running cookie classification for all folders...")
+        cookie_classifier.classify_corpus(base_dir, max_workers=max_workers)
+        
         # Process each folder with progress bar
         with tqdm(total=len(folders), desc="Processing folders", unit="folder") as progress_bar:
             for folder in folders:
@@ -68,10 +72,6 @@ def process_all_crawler_data(base_dir=None, banner_data_dir=None, max_workers=4)
                 progress_bar.set_description(f"Running source identification for {folder[:10]}...")
                 source_identifier.identify_site_sources(folder_path)
                 
-                # Then run cookie_classifier
-                progress_bar.set_description(f"Running cookie classification for {folder[:10]}...")
-                cookie_classifier.classify_directory(folder_path)
-                
                 # Add domain categories
                 progress_bar.set_description(f"Adding domain categories for {folder[:10]}...")
                 add_categories_to_files(folder_path)
@@ -3,7 +3,7 @@ import json
 import sys
 from tqdm import tqdm
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import cv2  # Add this import at the top with the other imports
 import numpy as np
 
@@ -14,19 +14,49 @@ if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
 
-from src.analyzers.screenshot_analyzer import analyze_screenshots
+from src.analyzers.screenshot_analyzer import analyze_screenshots, process_domain_screenshots
 from src.analyzers.html_analyzer import analyze_cookie_consent_text
-from src.analyzers.check_page_loaded import check_domain_screenshots
+from src.analyzers.banner_results_store import BannerResultsStore
+
+# Per-process analyzer used by analyze_all_banners workers
+_worker_analyzer = None
+
+
+def _init_banner_worker(options):
+    """Set up the analyzer once per worker process instead of once per domain"""
+    global _worker_analyzer
+    _worker_analyzer = BannerAnalyzer(**options)
+
+
+def _analyze_domain_in_worker(domain):
+    """Analyze one domain inside an analyze_all_banners worker"""
+    return domain, _worker_analyzer.analyze_domain(domain)
+
 
 class BannerAnalyzer:
     """Class to analyze banner data from screenshots and HTML"""
     
-    def __init__(self, banner_data_dir="data/banner_data", crawler_data_dir="data/crawler_data", verbose=False):
-        """Initialize with paths to data directories"""
+    def __init__(self, banner_data_dir="data/banner_data", crawler_data_dir="data/crawler_data", verbose=False,
+                 roi_ocr=False, diff_prefilter=True, html_text_mode='visible', results_dir=None,
+                 extension_folders=None):
+        """
+        Initialize with paths to data directories
+        
+        Set roi_ocr to only OCR likely banner regions of each screenshot instead of the full viewport.
+        With diff_prefilter, extension screenshots that are pixel-identical to the no_extension
+        baseline (or only differ in one region) reuse the baseline OCR.
+        html_text_mode selects what HTML text is searched for keywords ('raw', 'visible' or 'banner').
+        Results are written to a sidecar store in results_dir (default: <banner_data_dir>/results).
+        Pass extension_folders to skip rescanning crawler_data_dir.
+        """
         self.banner_data_dir = banner_data_dir
         self.crawler_data_dir = crawler_data_dir
         self.verbose = verbose 
-        self.extension_folders = self.get_extension_folders()
+        self.roi_ocr = roi_ocr
+        self.diff_prefilter = diff_prefilter
+        self.html_text_mode = html_text_mode
+        self.results_store = BannerResultsStore(results_dir or os.path.join(banner_data_dir, "results"))
+        self.extension_folders = extension_folders if extension_folders is not None else self.get_extension_folders()
 
     def _log(self, message):
         """Log a message if verbose is True"""
@@ -97,19 +127,20 @@ class BannerAnalyzer:
             self._log(f"No data found for domain {domain}, skipping")
             return {}
         
-        # First check if pages loaded properly
+        # Check if pages loaded properly and analyze screenshots from one OCR pass per image
         page_loaded_results = {}
-        if screenshots_exist and os.listdir(domain_screenshot_dir):
-            page_loaded_results = check_domain_screenshots(domain_screenshot_dir)
-        
-        # Then analyze screenshots and HTML only if needed
         screenshot_results = {}
         if screenshots_exist and os.listdir(domain_screenshot_dir):
-            screenshot_results = analyze_screenshots(domain_screenshot_dir)
+            page_loaded_results, screenshot_results = process_domain_screenshots(
+                domain_screenshot_dir,
+                roi=self.roi_ocr,
+                html_dir=domain_html_dir if html_exists else None,
+                diff_prefilter=self.diff_prefilter
+            )
         
         html_results = {}
         if html_exists and os.listdir(domain_html_dir):
-            html_results = analyze_cookie_consent_text(domain_html_dir)
+            html_results = analyze_cookie_consent_text(domain_html_dir, text_mode=self.html_text_mode)
         
         # Process results to create the banner_results structure
         banner_results = self.process_domain_results(
@@ -325,85 +356,31 @@ class BannerAnalyzer:
         # Return just the status and reason without confidence
         return status, reason
     
-    def update_extension_files(self, domain, banner_results, test_run=False):
-        """Update the appropriate extension JSON files with banner analysis results"""
-        
-        # Try different domain filename formats
-        domain_filenames = [
-            f"{domain}.json",
-            f"{domain.replace('.', '_')}.json",
-            f"{domain.lower()}.json",
-            f"{domain.lower().replace('www.', '')}.json",
-            f"www.{domain}.json" if not domain.startswith('www.') else None
-        ]
-        
-        # Remove None entries that might exist
-        domain_filenames = [f for f in domain_filenames if f]
-        
-        # Track how many extension folders we updated
-        updated_count = 0
-        
-        for ext_folder in self.extension_folders:
-            ext_key = ext_folder.replace(" ", "_").lower()
-            ext_folder_path = os.path.join(self.crawler_data_dir, ext_folder)
-            
-            # Skip if this extension doesn't have any results for this domain
-            if ext_key not in banner_results:
-                continue
-            
-            # Find the domain file in this extension folder
-            domain_file_path = None
-            for filename in domain_filenames:
-                test_path = os.path.join(ext_folder_path, filename)
-                if os.path.exists(test_path):
-                    domain_file_path = test_path
-                    break
-            
-            if domain_file_path:
-                try:
-                    # Load existing data
-                    with open(domain_file_path, 'r', encoding='utf-8') as f:
-                        site_data = json.load(f)
-                    
-                    # Extract results for this specific extension
-                    ext_results = banner_results[ext_key]
-                    
-                    # Create or update "banner_analysis" field
-                    if "banner_analysis" not in site_data:
-                        site_data["banner_analysis"] = {}
-                    
-                    # Add extension-specific results
-                    site_data["banner_analysis"].update(ext_results)
-                    
-                    # Save the updated data
-                    if not test_run:
-                        with open(domain_file_path, 'w', encoding='utf-8') as f:
-                            json.dump(site_data, f, indent=2)
-                
-                    updated_count += 1
-                    
-                except Exception as e:
-                    tqdm.write(f"Error updating {domain_file_path}: {e}")
-            else:
-                self._log(f"No file found for {domain} in {ext_folder}")
-        
-        if updated_count == 0:
-            self._log(f"Could not update any files for domain {domain}")
+    def _worker_options(self):
+        """Constructor arguments that recreate this analyzer in a worker process"""
+        return {
+            "banner_data_dir": self.banner_data_dir,
+            "crawler_data_dir": self.crawler_data_dir,
+            "roi_ocr": self.roi_ocr,
+            "diff_prefilter": self.diff_prefilter,
+            "html_text_mode": self.html_text_mode,
+            "results_dir": self.results_store.results_dir,
+            "extension_folders": self.extension_folders
+        }
     
-    def analyze_domain_wrapper(self, args):
+    def analyze_all_banners(self, test_run=True, test_domain=None, test_count=None, 
+                           use_parallel=False, max_workers=None, merge_results=False, max_in_flight=None):
         """
-        A standalone wrapper function for multiprocessing that unpacks arguments and calls analyze_domain.
-        This avoids pickling class methods directly.
+        Run analyses and store banner analysis results
+        
+        Results are appended to the sidecar results store as each domain finishes
+        (json_to_csv reads them from there). Set merge_results to also write them
+        into the crawl JSON files afterwards, merging all profiles in parallel.
+        Nothing is written in test runs.
+        
+        In parallel mode at most max_in_flight domains (default: 4 per worker) are
+        submitted at a time, so memory stays flat regardless of the number of domains.
         """
-        domain, banner_data_dir, crawler_data_dir, extension_folders = args
-        # Create a temporary analyzer just for this process
-        temp_analyzer = BannerAnalyzer(banner_data_dir=banner_data_dir, crawler_data_dir=crawler_data_dir)
-        temp_analyzer.extension_folders = extension_folders
-        return domain, temp_analyzer.analyze_domain(domain)
-    
-    def analyze_all_banners(self, test_run=True, test_domain=None, test_count=None, 
-                           use_parallel=False, max_workers=None):
-        """Run analyses and update JSON files with banner analysis results"""
         # Get domains to analyze
         domains = self.get_domains_to_analyze(test_domain, test_count)
         if not domains:
@@ -417,60 +394,64 @@ class BannerAnalyzer:
         # Track timing
         start_time = time.time()
         
-        if use_parallel and len(domains) > 1:
-            # Setup to collect all results
-            domain_results = {}
-            total = len(domains)
-            completed = 0
-            
-            # Create progress bar
-            progress_bar = tqdm(total=total, desc="Analyzing domains")
-            
-            # Process domains in parallel
-            with ProcessPoolExecutor(max_workers=max_workers) as executor:
-                # Prepare args tuples - each contains everything the function needs
-                args_list = [
-                    (domain, self.banner_data_dir, self.crawler_data_dir, self.extension_folders) 
-                    for domain in domains
-                ]
+        try:
+            if use_parallel and len(domains) > 1:
+                workers = max_workers or os.cpu_count() or 1
+                window = max_in_flight or workers * 4
                 
-                # Submit all tasks using the wrapper function
-                future_to_domain = {
-                    executor.submit(self.analyze_domain_wrapper, args): args[0] 
-                    for args in args_list
-                }
+                # Create progress bar
+                progress_bar = tqdm(total=len(domains), desc="Analyzing domains")
                 
-                # Process results as they complete
-                for future in as_completed(future_to_domain):
-                    domain = future_to_domain[future]
-                    try:
-                        domain_name, banner_results = future.result()
-                        domain_results[domain_name] = banner_results
+                # Each worker builds its analyzer once in the initializer
+                with ProcessPoolExecutor(max_workers=workers,
+                                         initializer=_init_banner_worker,
+                                         initargs=(self._worker_options(),)) as executor:
+                    domain_iter = iter(domains)
+                    pending = {}
+                    
+                    while True:
+                        # Top up the in-flight window
+                        while len(pending) < window:
+                            domain = next(domain_iter, None)
+                            if domain is None:
+                                break
+                            pending[executor.submit(_analyze_domain_in_worker, domain)] = domain
                         
-                        # Update progress bar
-                        completed += 1
-                        progress_bar.update(1)
-                        progress_bar.set_postfix({"Current": domain})
-                    except Exception as e:
-                        tqdm.write(f"Error processing domain {domain}: {e}")
-            
-            # Close progress bar
-            progress_bar.close()
-            
-            # Update extension files with results
-            print("Updating extension files...")
-            with tqdm(total=len(domain_results), desc="Updating extension files") as update_progress:
-                for domain, banner_results in domain_results.items():
-                    if banner_results:  # Only update if we have results
-                        self.update_extension_files(domain, banner_results, test_run)
-                    update_progress.update(1)
-                    update_progress.set_postfix({"Current": domain})
-        else:
-            # Process domains sequentially with a progress bar
-            for domain in tqdm(domains, desc="Analyzing domains"):
-                banner_results = self.analyze_domain(domain)
-                if banner_results:  # Only update if we have results
-                    self.update_extension_files(domain, banner_results, test_run)
+                        if not pending:
+                            break
+                        
+                        # Store results as they complete
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            domain = pending.pop(future)
+                            try:
+                                domain_name, banner_results = future.result()
+                                if banner_results and not test_run:
+                                    self.results_store.append(domain_name, banner_results)
+                            except Exception as e:
+                                tqdm.write(f"Error processing domain {domain}: {e}")
+                            
+                            # Update progress bar
+                            progress_bar.update(1)
+                            progress_bar.set_postfix({"Current": domain})
+                
+                # Close progress bar
+                progress_bar.close()
+            else:
+                # Process domains sequentially with a progress bar
+                for domain in tqdm(domains, desc="Analyzing domains"):
+                    banner_results = self.analyze_domain(domain)
+                    if banner_results and not test_run:
+                        self.results_store.append(domain, banner_results)
+        finally:
+            self.results_store.close()
+        
+        # Optionally write the results into the crawl files, one parallel pass over all profiles
+        if merge_results and not test_run:
+            updated = self.results_store.merge_into_crawler_data(
+                self.crawler_data_dir, self.extension_folders, max_workers=max_workers
+            )
+            self._log(f"Merged banner results into {updated} crawl files")
         
         # Report completion time
         elapsed_time = time.time() - start_time
@@ -571,7 +552,7 @@ class BannerAnalyzer:
         # Check for HTML data
         if os.path.exists(html_dir):
             print("\nHTML Keywords:")
-            html_results = analyze_cookie_consent_text(html_dir, verbose=False)
+            html_results = analyze_cookie_consent_text(html_dir, verbose=False, text_mode=self.html_text_mode)
             if "html_check" in html_results:
                 for visit_id, visit_data in html_results["html_check"].items():
                     print(f"\n  Visit {visit_id}:")
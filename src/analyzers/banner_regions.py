@@ -0,0 +1,169 @@
+import re
+import cv2
+import numpy as np
+
+from src.utils.keywords import CMP_HINTS
+
+# Size limits for candidate regions, as fractions of the viewport
+MIN_REGION_AREA = 0.03
+MAX_REGION_AREA = 0.9
+MIN_REGION_WIDTH = 0.3
+
+# Fraction of a row that must be a strong horizontal edge to count as a bar boundary
+BAR_EDGE_FRACTION = 0.6
+
+# Width screenshots are downscaled to before running the heuristics
+ANALYSIS_WIDTH = 640
+
+# Maximum number of regions to OCR per screenshot
+MAX_REGIONS = 4
+
+# Pixels of padding added around each region before cropping
+REGION_PADDING = 10
+
+_TAG_PATTERN = re.compile(r'<(?:div|section|aside|dialog|form|footer)\b[^>]*>', re.IGNORECASE)
+
+
+def find_html_region_hints(html_content):
+    """
+    Find where fixed/sticky or CMP containers are positioned in captured HTML
+
+    Args:
+        html_content: HTML of the page as captured next to the screenshot
+
+    Returns:
+        set: Any of 'top', 'bottom' and 'center'
+    """
+    hints = set()
+    if not html_content:
+        return hints
+
+    for match in _TAG_PATTERN.finditer(html_content):
+        attrs = match.group(0).lower()
+        compact = attrs.replace(' ', '')
+
+        is_fixed = 'position:fixed' in compact or 'position:sticky' in compact
+        is_cmp = any(hint in attrs for hint in CMP_HINTS)
+        if not (is_fixed or is_cmp):
+            continue
+
+        if 'bottom:0' in compact:
+            hints.add('bottom')
+        elif 'top:0' in compact and not is_cmp:
+            # Fixed top:0 elements without CMP markers are usually sticky site headers
+            continue
+        elif 'top:0' in compact:
+            hints.add('top')
+        else:
+            hints.add('center')
+
+        if len(hints) == 3:
+            break
+
+    return hints
+
+
+def _hint_to_region(hint, width, height):
+    """Convert an HTML position hint to a viewport region (x, y, w, h)"""
+    if hint == 'bottom':
+        return (0, int(height * 0.6), width, height - int(height * 0.6))
+    if hint == 'top':
+        return (0, 0, width, int(height * 0.35))
+    return (int(width * 0.2), int(height * 0.2), int(width * 0.6), int(height * 0.6))
+
+
+def _find_bar_regions(gray):
+    """Find full-width top/bottom bars from strong horizontal edges"""
+    height, width = gray.shape[:2]
+    grad = np.abs(np.diff(gray.astype(np.int16), axis=0))
+    edge_rows = np.flatnonzero((grad > 30).mean(axis=1) > BAR_EDGE_FRACTION)
+
+    regions = []
+    bottom_edges = edge_rows[edge_rows > height * 0.4]
+    if len(bottom_edges):
+        y = int(bottom_edges.min())
+        regions.append((0, y, width, height - y))
+
+    top_edges = edge_rows[edge_rows < height * 0.4]
+    if len(top_edges):
+        y = int(top_edges.max())
+        regions.append((0, 0, width, y + 1))
+
+    return regions
+
+
+def _find_box_regions(gray):
+    """Find high-contrast rectangles such as modal dialogs"""
+    height, width = gray.shape[:2]
+    edges = cv2.Canny(gray, 50, 150)
+    closed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, np.ones((15, 15), np.uint8))
+    contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        area = (w * h) / float(width * height)
+        if MIN_REGION_AREA <= area <= MAX_REGION_AREA and w >= width * MIN_REGION_WIDTH:
+            regions.append((x, y, w, h))
+
+    return regions
+
+
+def _contains(outer, inner):
+    """Check whether region outer fully contains region inner"""
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return ox <= ix and oy <= iy and ox + ow >= ix + iw and oy + oh >= iy + ih
+
+
+def _merge_regions(regions):
+    """Drop regions that are contained in another, largest first"""
+    merged = []
+    for region in sorted(regions, key=lambda r: r[2] * r[3], reverse=True):
+        if not any(_contains(kept, region) for kept in merged):
+            merged.append(region)
+    return merged[:MAX_REGIONS]
+
+
+def find_banner_regions(gray, html_content=None):
+    """
+    Find candidate cookie banner regions in a grayscale screenshot
+
+    Combines cheap heuristics: full-width bars at the top/bottom of the viewport,
+    high-contrast rectangles (modals on a dimmed overlay) and positions of
+    fixed/CMP containers in the captured HTML.
+
+    Args:
+        gray: Grayscale screenshot as a numpy array
+        html_content: Optional HTML captured with the screenshot
+
+    Returns:
+        list: Regions as (x, y, w, h) tuples in full-size pixel coordinates,
+              empty if no candidate was found
+    """
+    height, width = gray.shape[:2]
+    if height == 0 or width == 0:
+        return []
+
+    # Run the image heuristics on a downscaled copy
+    scale = min(1.0, ANALYSIS_WIDTH / float(width))
+    small = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA) \
+        if scale < 1.0 else gray
+
+    candidates = [
+        tuple(int(round(v / scale)) for v in region)
+        for region in _find_bar_regions(small) + _find_box_regions(small)
+    ]
+    candidates.extend(_hint_to_region(hint, width, height) for hint in find_html_region_hints(html_content))
+
+    # Pad and clip to the viewport
+    regions = []
+    for x, y, w, h in candidates:
+        x0 = max(0, x - REGION_PADDING)
+        y0 = max(0, y - REGION_PADDING)
+        x1 = min(width, x + w + REGION_PADDING)
+        y1 = min(height, y + h + REGION_PADDING)
+        if x1 > x0 and y1 > y0:
+            regions.append((x0, y0, x1 - x0, y1 - y0))
+
+    return _merge_regions(regions)
@@ -0,0 +1,169 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+
+
+def domain_file_stems(domain):
+    """Get the crawl file names (without .json) a banner domain can be stored under"""
+    stems = [
+        domain,
+        domain.replace('.', '_'),
+        domain.lower(),
+        domain.lower().replace('www.', ''),
+        f"www.{domain}" if not domain.startswith('www.') else None
+    ]
+    # Remove None entries and duplicates while keeping the lookup order
+    return list(dict.fromkeys(s for s in stems if s))
+
+
+def find_domain_file(ext_folder_path, domain):
+    """Find the crawl JSON file for a domain in an extension folder, or None"""
+    for stem in domain_file_stems(domain):
+        path = os.path.join(ext_folder_path, f"{stem}.json")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class BannerResultsStore:
+    """
+    Sidecar store for banner analysis results.
+
+    Results are appended as one JSON line per domain to a file per extension
+    profile (<results_dir>/<ext_key>.jsonl), instead of rewriting every profile's
+    crawl JSON. Later lines for the same domain replace earlier ones, so reruns
+    simply append.
+    """
+
+    def __init__(self, results_dir="data/banner_data/results"):
+        """Initialize the store rooted at results_dir"""
+        self.results_dir = results_dir
+        self._handles = {}
+
+    def __getstate__(self):
+        # Open file handles stay in the process that owns them
+        state = self.__dict__.copy()
+        state['_handles'] = {}
+        return state
+
+    def _profile_path(self, ext_key):
+        """Get the sidecar file path for an extension key"""
+        return os.path.join(self.results_dir, f"{ext_key}.jsonl")
+
+    def append(self, domain, banner_results):
+        """
+        Append one domain's results for every extension in banner_results
+
+        Args:
+            domain: Domain name
+            banner_results: Dict mapping extension keys to that extension's banner analysis
+        """
+        os.makedirs(self.results_dir, exist_ok=True)
+        for ext_key, ext_results in banner_results.items():
+            handle = self._handles.get(ext_key)
+            if handle is None:
+                handle = open(self._profile_path(ext_key), 'a', encoding='utf-8')
+                self._handles[ext_key] = handle
+            handle.write(json.dumps({"domain": domain, "banner_analysis": ext_results}) + "\n")
+
+    def flush(self):
+        """Flush all open sidecar files"""
+        for handle in self._handles.values():
+            handle.flush()
+
+    def close(self):
+        """Close all open sidecar files"""
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+    def load_profile(self, ext_key):
+        """
+        Load all results for one extension profile
+
+        Returns:
+            dict: Domain -> banner_analysis (latest entry wins)
+        """
+        path = self._profile_path(ext_key)
+        results = {}
+        if not os.path.exists(path):
+            return results
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crashed run can leave a truncated last line
+                    continue
+                results[entry["domain"]] = entry["banner_analysis"]
+        return results
+
+    def load_profile_index(self, ext_key):
+        """
+        Load results for one profile keyed by every crawl file stem the domain may use
+
+        Returns:
+            dict: Crawl file name without .json -> banner_analysis
+        """
+        index = {}
+        for domain, banner_analysis in self.load_profile(ext_key).items():
+            for stem in domain_file_stems(domain):
+                index.setdefault(stem, banner_analysis)
+        return index
+
+    def merge_into_crawler_data(self, crawler_data_dir, extension_folders, max_workers=None, test_run=False):
+        """
+        Write the stored results into the 'banner_analysis' field of the crawl JSON files
+
+        Profiles are merged in parallel, and each crawl file is loaded and written once.
+
+        Returns:
+            int: Number of crawl files updated
+        """
+        args_list = [
+            (self.results_dir, crawler_data_dir, ext_folder, test_run)
+            for ext_folder in extension_folders
+        ]
+
+        updated = 0
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_merge_profile, args): args[2] for args in args_list}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Merging banner results"):
+                try:
+                    updated += future.result()
+                except Exception as e:
+                    tqdm.write(f"Error merging banner results for {futures[future]}: {e}")
+        return updated
+
+
+def _merge_profile(args):
+    """Merge one profile's sidecar results into its crawl files (runs in a worker process)"""
+    results_dir, crawler_data_dir, ext_folder, test_run = args
+    ext_key = ext_folder.replace(" ", "_").lower()
+    ext_folder_path = os.path.join(crawler_data_dir, ext_folder)
+
+    updated = 0
+    for domain, ext_results in BannerResultsStore(results_dir).load_profile(ext_key).items():
+        domain_file_path = find_domain_file(ext_folder_path, domain)
+        if not domain_file_path:
+            continue
+
+        try:
+            with open(domain_file_path, 'r', encoding='utf-8') as f:
+                site_data = json.load(f)
+
+            site_data.setdefault("banner_analysis", {}).update(ext_results)
+
+            if not test_run:
+                with open(domain_file_path, 'w', encoding='utf-8') as f:
+                    json.dump(site_data, f, indent=2)
+            updated += 1
+        except Exception as e:
+            tqdm.write(f"Error updating {domain_file_path}: {e}")
+
+    return updated
@@ -1,17 +1,17 @@
 import os
 import re
-import pytesseract
-import cv2
+import sys
 import logging
 import json
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from src.analyzers.ocr_cache import ocr_image
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-
 # Phrases that indicate bot detection, CAPTCHAs, or errors
 BOT_DETECTION_PHRASES = [
     "access denied", 
@@ -66,26 +66,17 @@ ERROR_PHRASES = [
     "you don't have permission"
 ]
 
-def extract_text_from_image(image_path):
+def extract_text_from_image(image_path, use_cache=True):
     """Extract text from an image using grayscale preprocessing and PSM 3"""
     try:
-        # Read the image with OpenCV for preprocessing
-        img = cv2.imread(image_path)
-        if img is None:
+        # Grayscale + PSM 3 (best combination based on testing), served from the shared OCR cache
+        result = ocr_image(image_path, use_cache=use_cache)
+        if result is None:
             logger.error(f"Could not load image: {image_path}")
             return ""
         
-        # Convert to grayscale (best preprocessing method based on testing)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Use PSM 3 (fully automatic page segmentation)
-        text = pytesseract.image_to_string(
-            gray, 
-            config='--psm 3 --oem 3'
-        )
-        
         # Clean up the text
-        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s+', ' ', result['text'])
         text = text.strip()
         
         return text
@@ -110,9 +101,24 @@ def check_page_loaded(screenshot_path):
     """
     # Extract text from screenshot
     text = extract_text_from_image(screenshot_path)
+    return check_page_text(text)
+
+def check_page_text(text):
+    """
+    Check if a page has loaded properly based on text already extracted from its screenshot
+    
+    Args:
+        text: OCR text of the screenshot
+        
+    Returns:
+        dict: Same structure as check_page_loaded
+    """
+    # Normalize whitespace so multi-word phrases match across line breaks
+    text = re.sub(r'\s+', ' ', text or '').strip()
+    lower_text = text.lower()
     
     # Clean and split the text
-    words = re.findall(r'\b\w+\b', text.lower())
+    words = re.findall(r'\b\w+\b', lower_text)
     word_count = len(words)
     
     # Initialize result
@@ -126,21 +132,21 @@ def check_page_loaded(screenshot_path):
     
     # Check for bot detection
     for phrase in BOT_DETECTION_PHRASES:
-        if phrase.lower() in text.lower():
+        if phrase.lower() in lower_text:
             result["detected_phrases"].append(phrase)
             result["status"] = "bot_detected"
             return result
     
     # Check for CAPTCHA
     for phrase in CAPTCHA_PHRASES:
-        if phrase.lower() in text.lower():
+        if phrase.lower() in lower_text:
             result["detected_phrases"].append(phrase)
             result["status"] = "captcha"
             return result
     
     # Check for errors - use more context-aware checking
     for phrase in ERROR_PHRASES:
-        if phrase.lower() in text.lower():
+        if phrase.lower() in lower_text:
             result["detected_phrases"].append(phrase)
             result["status"] = "error"
             return result
@@ -155,12 +161,13 @@ def check_page_loaded(screenshot_path):
     result["status"] = "loaded"
     return result
 
-def check_domain_screenshots(screenshots_dir):
+def check_domain_screenshots(screenshots_dir, texts=None):
     """
     Check all screenshots in a domain directory
     
     Args:
         screenshots_dir: Path to the screenshots directory
+        texts: Optional dict mapping filenames to already extracted OCR text
         
     Returns:
         dict: Results for all screenshots
@@ -197,8 +204,11 @@ def check_domain_screenshots(screenshots_dir):
         
         # Process each file without tqdm
         for file in files:
-            file_path = os.path.join(screenshots_dir, file)
-            result = check_page_loaded(file_path)
+            if texts is not None and file in texts:
+                result = check_page_text(texts[file])
+            else:
+                file_path = os.path.join(screenshots_dir, file)
+                result = check_page_loaded(file_path)
             results[f"visit{visit_num}"][file] = result
     
     return results
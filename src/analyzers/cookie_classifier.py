@@ -5,6 +5,7 @@ from typing import Dict, Any, Set
 from tqdm import tqdm
 from collections import Counter, defaultdict
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add project root to path
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +17,22 @@ from src.managers.cookie_manager import CookieManager
 from src.crawler.cookie_crawler import CookieCrawler
 
 
+# Per-process classifier used by classify_corpus workers
+_worker_classifier = None
+
+
+def _init_corpus_worker(db_file):
+    """Load the cookie database once per worker process"""
+    global _worker_classifier
+    _worker_classifier = CookieClassifier(cookie_manager=CookieManager(db_file=db_file))
+
+
+def _classify_corpus_file(file_path):
+    """Classify and save a single file inside a classify_corpus worker"""
+    site_data = _worker_classifier.classify_file(file_path, lookup_unknown=False)
+    return file_path, bool(site_data)
+
+
 class CookieClassifier:
     """
     Classifies cookies found on websites by looking them up in the cookie database.
@@ -187,6 +204,81 @@ class CookieClassifier:
         
         return results
     
+    def classify_corpus(self, base_dir: str, lookup_unknown=True, max_workers=None) -> Dict[str, int]:
+        """
+        Classify cookies in every profile folder under base_dir at once.
+        
+        Unlike calling classify_directory per profile, unknown cookies are
+        collected across all profiles first, looked up in a single batch and
+        every file is then classified in parallel and written exactly once.
+        
+        Args:
+            base_dir: Directory containing one folder per profile (e.g. data/crawler_data)
+            lookup_unknown: Whether to look up unknown cookies
+            max_workers: Number of worker processes (None for CPU count)
+            
+        Returns:
+            Dictionary with counts of files found, classified and failed
+        """
+        self.unknown_cookies.clear()
+        
+        # Collect crawl files from all profile folders
+        all_files = []
+        for folder in sorted(os.listdir(base_dir)):
+            folder_path = os.path.join(base_dir, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            all_files.extend(
+                os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith('.json')
+            )
+        self._log(f"Found {len(all_files)} JSON files across all profiles")
+        
+        # Phase 1: stream files one at a time and gather the deduplicated unknown set
+        files_to_process = []
+        for file_path in tqdm(all_files, desc="Collecting unknown cookies"):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    site_data = json.load(f)
+            except Exception as e:
+                tqdm.write(f"Error reading {file_path}: {str(e)}")
+                continue
+            
+            if 'cookie_analysis' in site_data:
+                self._log(f"Skipping {file_path} - already analyzed")
+                continue
+            
+            files_to_process.append(file_path)
+            self.unknown_cookies.update(self._extract_unknown_cookies(site_data))
+        
+        stats = {'total_files': len(all_files), 'classified': 0, 'failed': 0}
+        if not files_to_process:
+            self._log("No files need cookie analysis")
+            return stats
+        
+        # Phase 2: one batched lookup for the whole corpus
+        if lookup_unknown and self.unknown_cookies:
+            self._log(f"\nFound {len(self.unknown_cookies)} unique unknown cookies across all profiles")
+            self._init_crawler()
+            self.crawler.lookup_cookies_batch(list(self.unknown_cookies))
+            # Workers load the database from disk, so make sure lookups are persisted
+            self.cookie_manager.save()
+        
+        # Phase 3: classify all files in parallel, one write per file
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_corpus_worker,
+                                 initargs=(self.cookie_manager.db_file,)) as executor:
+            futures = [executor.submit(_classify_corpus_file, path) for path in files_to_process]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Classifying cookies"):
+                try:
+                    _, success = future.result()
+                except Exception as e:
+                    tqdm.write(f"Error in cookie classification worker: {str(e)}")
+                    success = False
+                stats['classified' if success else 'failed'] += 1
+        
+        self._log(f"Classified {stats['classified']} files ({stats['failed']} failed)")
+        return stats
+    
     def print_site_summary(self, site_data: Dict[str, Any]) -> None:
         """Print a summary of cookie analysis for a site"""
         analysis = site_data.get('cookie_analysis', {})
@@ -8,17 +8,46 @@ import sys
 
 # Add the root directory to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from src.utils.keywords import COOKIE_KEYWORDS
+from src.utils.keywords import COOKIE_KEYWORD_MATCHER
+from src.analyzers.html_text import get_visible_text
 
+# How HTML files are turned into text before keyword matching:
+#   raw     - the full page.content() HTML, including scripts and CMP config
+#   visible - visible text only (scripts, styles, comments and hidden elements removed)
+#   banner  - only text inside banner-like containers (fixed/sticky elements, CMP ids)
+HTML_TEXT_MODES = ('raw', 'visible', 'banner')
 
-def analyze_cookie_consent_text(directory, verbose=False):
+
+def load_html_text(file_path, text_mode='visible'):
+    """
+    Load an HTML file as text for keyword matching
+    
+    Args:
+        file_path: Path to the HTML file
+        text_mode: One of HTML_TEXT_MODES
+    """
+    if text_mode == 'raw':
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    
+    result = get_visible_text(file_path)
+    if text_mode == 'banner':
+        return result['banner_text']
+    return result['text']
+
+
+def analyze_cookie_consent_text(directory, verbose=False, text_mode='visible'):
     """
     Analyze HTML files to detect cookie consent text and compare between baseline and extensions
     
     Args:
         directory: Path to the directory containing HTML files
         verbose: Whether to print verbose output
+        text_mode: How HTML is converted to text before matching, one of HTML_TEXT_MODES
     """
+    if text_mode not in HTML_TEXT_MODES:
+        raise ValueError(f"Unknown text_mode '{text_mode}', expected one of {HTML_TEXT_MODES}")
+    
     # Get all HTML files in the directory
     all_files = [f for f in os.listdir(directory) if f.endswith('.html')]
     
@@ -69,14 +98,10 @@ def analyze_cookie_consent_text(directory, verbose=False):
         # Process the no_extension HTML
         no_ext_path = os.path.join(directory, no_ext_file)
         try:
-            with open(no_ext_path, 'r', encoding='utf-8', errors='ignore') as f:
-                no_ext_content = f.read()
+            no_ext_content = load_html_text(no_ext_path, text_mode)
             
             # Find cookie keywords in baseline HTML
-            found_keywords = []
-            for keyword in COOKIE_KEYWORDS:
-                if re.search(r'\b' + re.escape(keyword) + r'\b', no_ext_content, re.IGNORECASE):
-                    found_keywords.append(keyword)
+            found_keywords = COOKIE_KEYWORD_MATCHER.find_all(no_ext_content)
             
             if found_keywords:
                 if verbose:
@@ -96,8 +121,7 @@ def analyze_cookie_consent_text(directory, verbose=False):
                 tqdm.write(f"Analyzing: {ext_file}")
             ext_path = os.path.join(directory, ext_file)
             try:
-                with open(ext_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    ext_content = f.read()
+                ext_content = load_html_text(ext_path, text_mode)
                 
                 # If no keywords were found in baseline, we can't determine if banner was removed
                 if not found_keywords:
@@ -110,13 +134,8 @@ def analyze_cookie_consent_text(directory, verbose=False):
                     continue
                 
                 # Check if keywords from baseline are missing
-                missing_keywords = []
-                matched_keywords = []
-                for keyword in found_keywords:
-                    if re.search(r'\b' + re.escape(keyword) + r'\b', ext_content, re.IGNORECASE):
-                        matched_keywords.append(keyword)
-                    else:
-                        missing_keywords.append(keyword)
+                matched_keywords = COOKIE_KEYWORD_MATCHER.find_all(ext_content, candidates=found_keywords)
+                missing_keywords = [kw for kw in found_keywords if kw not in matched_keywords]
                 
                 json_results["html_check"][f"visit{visit_num}"]["extensions"][ext_file] = {
                     "html": matched_keywords,
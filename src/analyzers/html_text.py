@@ -0,0 +1,156 @@
+from html.parser import HTMLParser
+
+from src.utils.keywords import CMP_HINTS
+from src.utils.content_cache import ContentCache
+
+# Default location of the on-disk visible-text cache
+HTML_TEXT_CACHE_DIR = 'data/db+ref/html_text_cache'
+
+# Elements whose content is never rendered as text
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'iframe', 'object'}
+
+# Elements without a closing tag
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+}
+
+
+class VisibleTextExtractor(HTMLParser):
+    """
+    Collects the visible text of an HTML document.
+
+    Scripts, styles, comments and inline-hidden elements are dropped. Text inside
+    banner-like containers (fixed/sticky elements or common CMP ids/classes) is
+    additionally collected on its own.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text_parts = []
+        self.banner_parts = []
+        self._stack = []
+        self._skip_depth = None
+        self._banner_depth = None
+
+    def _is_hidden(self, tag, attrs):
+        """Check if an element is skipped or hidden by its inline attributes"""
+        if tag in SKIPPED_TAGS or 'hidden' in attrs or attrs.get('aria-hidden') == 'true':
+            return True
+        style = (attrs.get('style') or '').replace(' ', '').lower()
+        return 'display:none' in style or 'visibility:hidden' in style
+
+    def _is_banner(self, attrs):
+        """Check if an element looks like a cookie banner container"""
+        style = (attrs.get('style') or '').replace(' ', '').lower()
+        if 'position:fixed' in style or 'position:sticky' in style:
+            return True
+        marker = f"{attrs.get('id') or ''} {attrs.get('class') or ''} {attrs.get('role') or ''}".lower()
+        return any(hint in marker for hint in CMP_HINTS) or 'dialog' in marker
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        self._stack.append(tag)
+        depth = len(self._stack)
+
+        if self._skip_depth is None and self._is_hidden(tag, attrs):
+            self._skip_depth = depth
+        elif self._skip_depth is None and self._banner_depth is None and self._is_banner(attrs):
+            self._banner_depth = depth
+
+    def handle_endtag(self, tag):
+        if tag not in self._stack:
+            return
+        # Close any unclosed children along with this element
+        while self._stack:
+            depth = len(self._stack)
+            if self._skip_depth is not None and depth <= self._skip_depth:
+                self._skip_depth = None
+            if self._banner_depth is not None and depth <= self._banner_depth:
+                self._banner_depth = None
+            if self._stack.pop() == tag:
+                break
+
+    def handle_data(self, data):
+        if self._skip_depth is not None:
+            return
+        data = data.strip()
+        if not data:
+            return
+        self.text_parts.append(data)
+        if self._banner_depth is not None:
+            self.banner_parts.append(data)
+
+
+def extract_visible_text(html_content):
+    """
+    Extract visible text from HTML
+
+    Args:
+        html_content: HTML as captured by the crawler
+
+    Returns:
+        dict: {'text': all visible text, 'banner_text': text inside banner-like containers}
+    """
+    parser = VisibleTextExtractor()
+    parser.feed(html_content)
+    parser.close()
+    return {
+        'text': ' '.join(parser.text_parts),
+        'banner_text': ' '.join(parser.banner_parts)
+    }
+
+
+class HTMLTextCache(ContentCache):
+    """Content-addressed cache of visible text extracted from HTML files"""
+
+    # Bump when the extraction rules change to invalidate old entries
+    version = 1
+
+    def __init__(self, cache_dir=HTML_TEXT_CACHE_DIR):
+        """Initialize the cache rooted at cache_dir"""
+        super().__init__(cache_dir)
+
+
+# Shared cache instance used by html_analyzer
+_default_cache = None
+
+
+def get_default_cache():
+    """Get the process-wide visible-text cache"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HTMLTextCache()
+    return _default_cache
+
+
+def get_visible_text(html_path, cache=None, use_cache=True):
+    """
+    Get the visible text of an HTML file, using the content-addressed cache
+
+    Args:
+        html_path: Path to the HTML file
+        cache: HTMLTextCache to use (defaults to the shared cache)
+        use_cache: Whether to read from and write to the cache
+
+    Returns:
+        dict: Same structure as extract_visible_text
+    """
+    with open(html_path, 'rb') as f:
+        html_bytes = f.read()
+
+    if use_cache:
+        cache = cache or get_default_cache()
+        key = HTMLTextCache.make_key(html_bytes)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    result = extract_visible_text(html_bytes.decode('utf-8', errors='ignore'))
+
+    if use_cache:
+        cache.put(key, result)
+
+    return result
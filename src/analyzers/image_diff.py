@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+
+# Width screenshots are downscaled to before diffing
+DIFF_WIDTH = 320
+
+# Grayscale difference (0-255) for a downscaled pixel to count as changed
+PIXEL_THRESHOLD = 25
+
+# Below this fraction of changed pixels the screenshots are treated as identical
+SAME_FRACTION = 0.005
+
+# Above this fraction of changed pixels the whole screenshot is treated as different
+LOCALIZE_MAX_FRACTION = 0.4
+
+# Padding (in downscaled pixels) around the changed region
+DIFF_PADDING = 4
+
+
+def load_diff_image(image_path):
+    """
+    Load a screenshot as a small grayscale array for diffing
+
+    Returns:
+        tuple: (small grayscale image, (full width, full height)), or (None, None)
+               if the image could not be loaded
+    """
+    # Let the decoder do most of the downscaling
+    img = cv2.imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if img is None:
+        return None, None
+
+    height, width = img.shape[:2]
+    full_size = (width * 4, height * 4)
+
+    scale = DIFF_WIDTH / float(width)
+    small = cv2.resize(img, (DIFF_WIDTH, max(1, int(round(height * scale)))), interpolation=cv2.INTER_AREA)
+    return small, full_size
+
+
+def compare_screenshots(baseline, baseline_size, other, other_size):
+    """
+    Compare a screenshot against its baseline using a downscaled pixel diff
+
+    Args:
+        baseline, other: Images from load_diff_image
+        baseline_size, other_size: Full-size (width, height) of the images
+
+    Returns:
+        tuple: (status, region) where status is one of
+            - 'same': near pixel-identical, region is None
+            - 'partial': only part of the page changed, region is the changed
+              (x, y, w, h) box in full-size coordinates
+            - 'different': too much changed (or sizes differ), region is None
+    """
+    if baseline is None or other is None or baseline.shape != other.shape or baseline_size != other_size:
+        return 'different', None
+
+    changed = cv2.absdiff(baseline, other) > PIXEL_THRESHOLD
+    fraction = changed.mean()
+
+    if fraction < SAME_FRACTION:
+        return 'same', None
+    if fraction > LOCALIZE_MAX_FRACTION:
+        return 'different', None
+
+    rows = np.flatnonzero(changed.any(axis=1))
+    cols = np.flatnonzero(changed.any(axis=0))
+
+    height, width = changed.shape
+    y0 = max(0, rows[0] - DIFF_PADDING)
+    y1 = min(height, rows[-1] + 1 + DIFF_PADDING)
+    x0 = max(0, cols[0] - DIFF_PADDING)
+    x1 = min(width, cols[-1] + 1 + DIFF_PADDING)
+
+    # Bounding box covers most of the page anyway, OCR everything
+    if (y1 - y0) * (x1 - x0) > LOCALIZE_MAX_FRACTION * height * width:
+        return 'different', None
+
+    scale_x = other_size[0] / float(width)
+    scale_y = other_size[1] / float(height)
+    region = (
+        int(x0 * scale_x),
+        int(y0 * scale_y),
+        int(np.ceil((x1 - x0) * scale_x)),
+        int(np.ceil((y1 - y0) * scale_y))
+    )
+    return 'partial', region
+
+
+def words_outside_region(words, region):
+    """Get the OCR word boxes that do not overlap region"""
+    rx, ry, rw, rh = region
+    kept = []
+    for word in words:
+        overlaps = (word['left'] < rx + rw and word['left'] + word['width'] > rx and
+                    word['top'] < ry + rh and word['top'] + word['height'] > ry)
+        if not overlaps:
+            kept.append(word)
+    return kept
@@ -0,0 +1,176 @@
+import os
+import hashlib
+import cv2
+import numpy as np
+
+from src.analyzers.banner_regions import find_banner_regions
+from src.analyzers.ocr_engine import get_ocr_engine
+from src.utils.content_cache import ContentCache
+
+# Default location of the on-disk OCR cache (next to the cookie database)
+OCR_CACHE_DIR = 'data/db+ref/ocr_cache'
+
+# Tesseract settings used by the banner pipeline (grayscale + PSM 3, see test_psm_modes.py)
+DEFAULT_OCR_CONFIG = '--psm 3 --oem 3'
+
+
+class OCRCache(ContentCache):
+    """
+    Content-addressed cache of OCR results.
+
+    Entries are keyed by the hash of the raw image bytes and the tesseract config
+    and hold both the text and the word boxes.
+    """
+
+    # Bump when the stored result format or preprocessing changes to invalidate old entries
+    version = 1
+
+    def __init__(self, cache_dir=OCR_CACHE_DIR):
+        """Initialize the cache rooted at cache_dir"""
+        super().__init__(cache_dir)
+
+
+# Shared cache instance used by screenshot_analyzer and check_page_loaded
+_default_cache = None
+
+
+def get_default_cache():
+    """Get the process-wide OCR cache"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OCRCache()
+    return _default_cache
+
+
+def _run_ocr(gray, config, offset=(0, 0)):
+    """
+    Run tesseract once and return both the text and the word boxes.
+
+    Text is rebuilt from the word data using tesseract's block/paragraph/line
+    numbering, so no second pass with image_to_string is needed.
+    """
+    data = get_ocr_engine().image_to_data(gray, config)
+
+    words = []
+    lines = []
+    current_line = None
+    current_par = None
+    line_words = []
+
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        if not word:
+            continue
+
+        par_id = (data['block_num'][i], data['par_num'][i])
+        line_id = par_id + (data['line_num'][i],)
+        if line_id != current_line:
+            if line_words:
+                lines.append(' '.join(line_words))
+            if current_par is not None and par_id != current_par:
+                lines.append('')  # Blank line between paragraphs, like image_to_string
+            current_line = line_id
+            current_par = par_id
+            line_words = []
+        line_words.append(word)
+
+        words.append({
+            'text': word,
+            'left': int(data['left'][i]) + offset[0],
+            'top': int(data['top'][i]) + offset[1],
+            'width': int(data['width'][i]),
+            'height': int(data['height'][i]),
+            'conf': float(data['conf'][i])
+        })
+
+    if line_words:
+        lines.append(' '.join(line_words))
+
+    return {'text': '\n'.join(lines), 'words': words}
+
+
+def _run_roi_ocr(gray, regions, config):
+    """OCR only the given regions and combine their text and word boxes"""
+    texts = []
+    words = []
+    # Top-to-bottom so the combined text reads in page order
+    for x, y, w, h in sorted(regions, key=lambda r: (r[1], r[0])):
+        result = _run_ocr(gray[y:y + h, x:x + w], config, offset=(x, y))
+        if result['text']:
+            texts.append(result['text'])
+        words.extend(result['words'])
+    return {'text': '\n\n'.join(texts), 'words': words}
+
+
+def ocr_image(image_path, config=DEFAULT_OCR_CONFIG, cache=None, use_cache=True, roi=False, html_path=None,
+              region=None):
+    """
+    OCR a screenshot with grayscale preprocessing, using the content-addressed cache
+
+    Args:
+        image_path: Path to the image file
+        config: Tesseract configuration string
+        cache: OCRCache to use (defaults to the shared cache)
+        use_cache: Whether to read from and write to the cache
+        roi: Only OCR candidate banner regions, falling back to the full page
+             when none are found
+        html_path: Optional HTML captured with the screenshot, used as region hints in ROI mode
+        region: Optional (x, y, w, h) box to OCR instead of the whole screenshot,
+                takes precedence over roi
+
+    Returns:
+        dict: {'text': extracted text, 'words': list of word boxes}, or None if
+              the image could not be loaded
+    """
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+
+    html_content = None
+    # Language packs change the output, the engine backend does not
+    cache_config = f"{config}|lang={get_ocr_engine().lang}"
+    if region is not None:
+        roi = False
+        cache_config += f"|region|{','.join(str(v) for v in region)}"
+    elif roi:
+        if html_path and os.path.exists(html_path):
+            with open(html_path, 'r', encoding='utf-8', errors='ignore') as f:
+                html_content = f.read()
+        # ROI results depend on the HTML hints too, so keep them apart from full-page results
+        html_digest = hashlib.sha256((html_content or '').encode('utf-8')).hexdigest()
+        cache_config += f"|roi|{html_digest}"
+
+    if use_cache:
+        cache = cache or get_default_cache()
+        key = OCRCache.make_key(image_bytes, cache_config)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    # Decode from the bytes already in memory instead of reading the file again
+    img = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    result = None
+    if region is not None:
+        x, y, w, h = region
+        height, width = gray.shape[:2]
+        x, y = min(max(0, x), width), min(max(0, y), height)
+        crop = gray[y:min(height, y + h), x:min(width, x + w)]
+        result = _run_ocr(crop, config, offset=(x, y)) if crop.size else {'text': '', 'words': []}
+    elif roi:
+        regions = find_banner_regions(gray, html_content)
+        if regions:
+            result = _run_roi_ocr(gray, regions, config)
+        # Fall back to the full page when no candidate region produced any text
+        if result is not None and not result['words']:
+            result = None
+
+    if result is None:
+        result = _run_ocr(gray, config)
+
+    if use_cache:
+        cache.put(key, result)
+
+    return result
@@ -0,0 +1,178 @@
+import os
+import re
+import sys
+import json
+
+# Project config file, OCR settings are read from its "ocr" section
+OCR_CONFIG_FILE = 'config.json'
+
+DEFAULT_OCR_SETTINGS = {
+    # 'auto' uses tesserocr when installed and falls back to pytesseract
+    'engine': 'auto',
+    # Tesseract binary used by pytesseract (on Linux it is normally on PATH)
+    'tesseract_cmd': r'C:\Program Files\Tesseract-OCR\tesseract.exe' if sys.platform == 'win32' else 'tesseract',
+    # Language packs, e.g. 'eng+dan'
+    'lang': 'eng',
+    # tessdata directory for tesserocr, None for the default location
+    'tessdata_path': None
+}
+
+
+def load_ocr_settings(config_file=OCR_CONFIG_FILE):
+    """
+    Load OCR settings from the "ocr" section of the project config
+
+    Missing keys (or a missing config file) fall back to DEFAULT_OCR_SETTINGS.
+    """
+    settings = dict(DEFAULT_OCR_SETTINGS)
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r') as f:
+                settings.update(json.load(f).get('ocr', {}))
+        except (OSError, json.JSONDecodeError, AttributeError):
+            pass
+    return settings
+
+
+def _parse_tesseract_config(config):
+    """Get the page segmentation and engine modes from a tesseract config string"""
+    psm = re.search(r'--psm\s+(\d+)', config)
+    oem = re.search(r'--oem\s+(\d+)', config)
+    return (int(psm.group(1)) if psm else 3), (int(oem.group(1)) if oem else 3)
+
+
+class PytesseractEngine:
+    """OCR through the tesseract command line (one subprocess per image)"""
+
+    name = 'pytesseract'
+
+    def __init__(self, settings):
+        import pytesseract
+        self._pytesseract = pytesseract
+        self.lang = settings['lang']
+        pytesseract.pytesseract.tesseract_cmd = settings['tesseract_cmd']
+
+    def image_to_data(self, gray, config):
+        """Run OCR and return word data in pytesseract's Output.DICT format"""
+        return self._pytesseract.image_to_data(
+            gray, lang=self.lang, config=config, output_type=self._pytesseract.Output.DICT
+        )
+
+
+class TesserocrEngine:
+    """
+    OCR through tesserocr's in-process API.
+
+    One PyTessBaseAPI is kept per page segmentation/engine mode and reused for every
+    image in this process, avoiding tesseract's startup and temp files per image.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, settings):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.lang = settings['lang']
+        self.tessdata_path = settings['tessdata_path']
+        self._apis = {}
+        # Create the default mode's API now, so a missing tessdata/lang fails here (RuntimeError)
+        self._get_api(3, 3)
+
+    def _get_api(self, psm, oem):
+        """Get (or create) the persistent API object for a mode combination"""
+        api = self._apis.get((psm, oem))
+        if api is None:
+            kwargs = {'lang': self.lang, 'psm': psm, 'oem': oem}
+            if self.tessdata_path:
+                kwargs['path'] = self.tessdata_path
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            self._apis[(psm, oem)] = api
+        return api
+
+    def image_to_data(self, gray, config):
+        """Run OCR and return word data in pytesseract's Output.DICT format"""
+        from PIL import Image
+
+        tesserocr = self._tesserocr
+        RIL = tesserocr.RIL
+        api = self._get_api(*_parse_tesseract_config(config))
+        api.SetImage(Image.fromarray(gray))
+        api.Recognize()
+
+        data = {key: [] for key in ('text', 'left', 'top', 'width', 'height', 'conf',
+                                    'block_num', 'par_num', 'line_num')}
+        block_num = par_num = line_num = 0
+
+        iterator = api.GetIterator()
+        if iterator is None:
+            return data
+
+        for word in tesserocr.iterate_level(iterator, RIL.WORD):
+            # Number blocks/paragraphs/lines the same way tesseract's TSV output does
+            if word.IsAtBeginningOf(RIL.BLOCK):
+                block_num += 1
+                par_num = line_num = 0
+            if word.IsAtBeginningOf(RIL.PARA):
+                par_num += 1
+                line_num = 0
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line_num += 1
+
+            box = word.BoundingBox(RIL.WORD)
+            if box is None:
+                continue
+            x1, y1, x2, y2 = box
+            data['text'].append(word.GetUTF8Text(RIL.WORD) or '')
+            data['left'].append(x1)
+            data['top'].append(y1)
+            data['width'].append(x2 - x1)
+            data['height'].append(y2 - y1)
+            data['conf'].append(word.Confidence(RIL.WORD))
+            data['block_num'].append(block_num)
+            data['par_num'].append(par_num)
+            data['line_num'].append(line_num)
+
+        return data
+
+    def close(self):
+        """Release the tesseract API objects"""
+        for api in self._apis.values():
+            api.End()
+        self._apis = {}
+
+
+def create_ocr_engine(settings=None):
+    """
+    Create an OCR engine from settings (defaults to load_ocr_settings())
+
+    Raises:
+        ValueError: If the configured engine is unknown
+        ImportError: If the configured engine is not installed
+        RuntimeError: If tesserocr cannot load the tessdata/language
+    """
+    settings = settings or load_ocr_settings()
+    engine = settings.get('engine', 'auto')
+
+    if engine == 'tesserocr':
+        return TesserocrEngine(settings)
+    if engine == 'pytesseract':
+        return PytesseractEngine(settings)
+    if engine == 'auto':
+        try:
+            return TesserocrEngine(settings)
+        except (ImportError, RuntimeError):
+            return PytesseractEngine(settings)
+
+    raise ValueError(f"Unknown OCR engine '{engine}', expected 'auto', 'tesserocr' or 'pytesseract'")
+
+
+# Engine shared by all OCR calls in this process (one per worker process)
+_engine = None
+
+
+def get_ocr_engine():
+    """Get the process-wide OCR engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = create_ocr_engine()
+    return _engine
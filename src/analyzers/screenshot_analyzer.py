@@ -1,8 +1,6 @@
 import os
 import re
 import sys
-import pytesseract
-import cv2
 from collections import defaultdict
 from tqdm import tqdm
 from pprint import pprint
@@ -10,34 +8,48 @@ from pprint import pprint
 # Add the root directory to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from src.utils.keywords import COOKIE_KEYWORDS
+from src.analyzers.ocr_cache import ocr_image
+from src.analyzers.check_page_loaded import check_domain_screenshots
+from src.analyzers.image_diff import load_diff_image, compare_screenshots, words_outside_region
 
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-
-def extract_text_from_image(image_path):
+def extract_text_from_image(image_path, use_cache=True):
     """
     Extract text from image using OCR
     
     Args:
         image_path: Path to the image file
+        use_cache: Whether to use the shared OCR cache
         
     Returns:
         str: Extracted text in lowercase
     """
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    
-    # Extract text from image with PSM 3 and OEM 3
-    text = pytesseract.image_to_string(
-        gray, 
-        config='--psm 3 --oem 3'
-    ).lower()
+    # Grayscale with PSM 3 and OEM 3, results are shared with check_page_loaded via the cache
+    result = ocr_image(image_path, use_cache=use_cache)
+    if result is None:
+        raise ValueError(f"Could not load image: {image_path}")
     
-    return text
+    return result['text'].lower()
+
 
+def _get_screenshot_text(directory, file, texts=None):
+    """Get lowercase OCR text for a screenshot, reusing pre-extracted text if available"""
+    if texts is not None and file in texts:
+        if texts[file] is None:
+            raise ValueError(f"Could not load image: {file}")
+        return texts[file].lower()
+    return extract_text_from_image(os.path.join(directory, file))
 
-def analyze_screenshots(directory="data/banner_data/screenshots/active.com", verbose=False):
-    # Directory path
+
+def analyze_screenshots(directory="data/banner_data/screenshots/active.com", verbose=False, texts=None):
+    """
+    Compare cookie keywords in extension screenshots against the no_extension baseline
+    
+    Args:
+        directory: Path to the domain's screenshot directory
+        verbose: Whether to print verbose output
+        texts: Optional dict mapping filenames to already extracted OCR text
+    """
     # Get all PNG/JPG files in the directory
     all_files = [f for f in os.listdir(directory) if f.endswith(('.png', '.jpg', '.jpeg'))]
     
@@ -86,9 +98,8 @@ def analyze_screenshots(directory="data/banner_data/screenshots/active.com", ver
         }
         
         # Process the no_extension screenshot
-        no_ext_path = os.path.join(directory, no_ext_file)
         try:
-            no_ext_text = extract_text_from_image(no_ext_path)
+            no_ext_text = _get_screenshot_text(directory, no_ext_file, texts)
             
             # Find cookie keywords in baseline image
             found_keywords = []
@@ -112,10 +123,8 @@ def analyze_screenshots(directory="data/banner_data/screenshots/active.com", ver
         for ext_file in ext_files:
             if verbose:
                 tqdm.write(f"Analyzing: {ext_file}")
-            ext_path = os.path.join(directory, ext_file)
             try:
-                # Extract text using the new function
-                ext_text = extract_text_from_image(ext_path)
+                ext_text = _get_screenshot_text(directory, ext_file, texts)
                 
                 # If no keywords were found in baseline, we can't determine if banner was removed
                 if not found_keywords:
@@ -162,5 +171,109 @@ def analyze_screenshots(directory="data/banner_data/screenshots/active.com", ver
     return json_results
 
 
+def _ocr_against_baseline(image_path, baseline):
+    """
+    OCR an extension screenshot, reusing the baseline OCR where the pixels are unchanged
+    
+    Args:
+        image_path: Path to the extension screenshot
+        baseline: (ocr result, diff image, full size) of the visit's no_extension screenshot
+        
+    Returns:
+        dict: OCR result, or None if the screenshot differs too much and needs full OCR
+    """
+    baseline_result, baseline_small, baseline_size = baseline
+    small, size = load_diff_image(image_path)
+    status, region = compare_screenshots(baseline_small, baseline_size, small, size)
+    
+    if status == 'same':
+        return baseline_result
+    
+    if status == 'partial':
+        # Keep the baseline words outside the changed box and only OCR the box itself
+        region_result = ocr_image(image_path, region=region)
+        if region_result is None:
+            return None
+        kept_words = words_outside_region(baseline_result['words'], region)
+        kept_text = ' '.join(word['text'] for word in kept_words)
+        return {
+            'text': '\n\n'.join(t for t in (kept_text, region_result['text']) if t),
+            'words': kept_words + region_result['words']
+        }
+    
+    return None
+
+
+def process_domain_screenshots(directory, verbose=False, roi=False, html_dir=None, diff_prefilter=True):
+    """
+    Run all screenshot checks for a domain from a single OCR pass per image
+    
+    Each screenshot is loaded and OCR'd once, and the same text feeds both the
+    page-loaded check (bot/captcha/error phrases) and the cookie keyword comparison.
+    
+    In ROI mode the region text is only used for the keyword comparison. Bot,
+    captcha and error pages are rarely inside the banner regions and a small banner
+    has too few words for the word count check, so the page-loaded check still runs
+    on full-page OCR (a second, cached, OCR pass per image).
+    
+    Args:
+        directory: Path to the domain's screenshot directory
+        verbose: Whether to print verbose output
+        roi: Only OCR candidate banner regions (see banner_regions.py)
+        html_dir: The domain's HTML directory, used for region hints in ROI mode
+        diff_prefilter: Compare extension screenshots with the no_extension baseline
+                        first and skip OCR for unchanged pixels (see image_diff.py)
+        
+    Returns:
+        tuple: (page_loaded_results, screenshot_results) in the same format as
+               check_domain_screenshots and analyze_screenshots
+    """
+    screenshot_files = [f for f in os.listdir(directory) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    
+    # Process baselines first so extension screenshots can be diffed against them
+    screenshot_files.sort(key=lambda f: 'no_extension' not in f)
+    baselines = {}
+    reused = 0
+    
+    # OCR every screenshot at most once
+    texts = {}
+    for file in screenshot_files:
+        file_path = os.path.join(directory, file)
+        visit_match = re.search(r'visit(\d+)_', file)
+        visit_num = visit_match.group(1) if visit_match else None
+        is_baseline = 'no_extension' in file
+        
+        html_path = None
+        if roi and html_dir:
+            html_path = os.path.join(html_dir, os.path.splitext(file)[0] + '.html')
+        try:
+            result = None
+            if diff_prefilter and not is_baseline and visit_num in baselines:
+                result = _ocr_against_baseline(file_path, baselines[visit_num])
+                if result is not None:
+                    reused += 1
+            if result is None:
+                result = ocr_image(file_path, roi=roi, html_path=html_path)
+            
+            if diff_prefilter and is_baseline and result and visit_num is not None:
+                small, size = load_diff_image(file_path)
+                baselines[visit_num] = (result, small, size)
+            
+            texts[file] = result['text'] if result else None
+        except Exception as e:
+            if verbose:
+                tqdm.write(f"Error extracting text from {file}: {e}")
+            texts[file] = None
+    
+    if verbose and diff_prefilter:
+        tqdm.write(f"Reused baseline OCR for {reused}/{len(screenshot_files)} screenshots")
+    
+    # Region text would miss bot/error pages outside the banner, so let the check OCR full pages
+    page_loaded_results = check_domain_screenshots(directory, texts=None if roi else texts)
+    screenshot_results = analyze_screenshots(directory, verbose=verbose, texts=texts)
+    
+    return page_loaded_results, screenshot_results
+
+
 if __name__ == "__main__":
     analyze_screenshots()
\ No newline at end of file
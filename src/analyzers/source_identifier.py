@@ -6,7 +6,6 @@ import dns.resolver
 from datetime import datetime
 import sys
 from tqdm import tqdm
-from urllib.parse import urlparse
 from collections import Counter
 import pickle
 sys.path.append('.')
@@ -14,6 +13,7 @@ from src.managers.ghostery_manager import GhosteryManager
 from src.analyzers.filter_manager import FilterManager
 from src.utils.domain_parser import get_base_domain, are_domains_related
 from src.utils.public_suffix_updater import update_public_suffix_list
+from src.utils.urlkit import url_netloc, url_origin
 from src.managers.dns_resolver import DNSResolver
 
 class SourceIdentifier:
@@ -52,8 +52,7 @@ class SourceIdentifier:
 
     def _get_base_url(self, url: str) -> str:
         """Extract the base URL from a full URL."""
-        parsed = urlparse(url)
-        return f"{parsed.scheme}://{parsed.netloc}"
+        return url_origin(url)
 
     def _check_tracking_cname(self, cname: str, tracking_list: list) -> bool:
         """Check if the CNAME resolution matches a known tracking domain."""
@@ -108,7 +107,7 @@ class SourceIdentifier:
             return cached_result
             
         # Perform full analysis if not cached
-        parsed_url = urlparse(base_url).netloc
+        parsed_url = url_netloc(base_url)
         
         self._log(f"\n==== Domain Analysis Debug: {parsed_url} ====")
         
@@ -159,7 +158,7 @@ class SourceIdentifier:
                 self._log(f"Organizations: {domain_info['organizations']}")
         
         # First determine if this is a first-party domain using domain structure
-        main_domain = main_site if '://' not in main_site else urlparse(main_site).netloc
+        main_domain = main_site if '://' not in main_site else url_netloc(main_site)
         
         self._log(f"\n==== FIRST-PARTY CHECK FOR {parsed_url} ====")
         self._log(f"Main domain: {main_domain}")
@@ -27,6 +27,12 @@ async def crawl_domain(profile, site_info, data_dir=None, subpages_nr=15, verbos
     general_config = config.get('general', {}) # Get the 'general' dictionary, or empty if missing
     viewport = general_config.get('viewport') 
     headless = general_config.get('headless') 
+    # 'route' intercepts all traffic, 'events' only observes it (faster, no proxying through Python)
+    network_capture = general_config.get('network_capture', 'route')
+    # Response body capture policy, see BodyCapturePolicy (e.g. {"mode": "hash", "max_bytes": 65536})
+    body_capture = general_config.get('body_capture')
+    # Push batched storage mutations from the page instead of only snapshotting storage
+    storage_push = general_config.get('storage_push', False)
 
     # Extract profile configuration (keep if needed elsewhere, otherwise remove)
     profile_config = get_profile_config(config, profile) 
@@ -63,7 +69,10 @@ async def crawl_domain(profile, site_info, data_dir=None, subpages_nr=15, verbos
             headless=headless,
             viewport=viewport,
             domain=domain,
-            channel=channel
+            channel=channel,
+            network_capture=network_capture,
+            body_capture=body_capture,
+            storage_push=storage_push
         )
         
         # Modify browser launch arguments based on profile
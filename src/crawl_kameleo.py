@@ -39,6 +39,12 @@ async def crawl_domain(profile_name, profile_id, site_info, data_dir=None,
     config = load_config('config.json')    
     # Extract profile configuration
     profile_config = get_profile_config(config, profile_name)
+    
+    # Capture settings shared with crawl.py
+    general_config = config.get('general', {})
+    network_capture = general_config.get('network_capture', 'route')
+    body_capture = general_config.get('body_capture')
+    storage_push = general_config.get('storage_push', False)
 
     # Construct paths
     user_data_dir, full_extension_path = construct_paths(config, profile_name)
@@ -58,7 +64,10 @@ async def crawl_domain(profile_name, profile_id, site_info, data_dir=None,
         visits=2,
         verbose=verbose,
         kameleo_client=kameleo_client,
-        extension_name=extension_name
+        extension_name=extension_name,
+        network_capture=network_capture,
+        body_capture=body_capture,
+        storage_push=storage_push
     )
     
     
@@ -1,16 +1,93 @@
 import os
+import asyncio
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from utils.keywords import CMP_HINTS
+
+# Resolves once a consent banner is visible (plus a short settle time for its animation),
+# or once the DOM has had no mutations for quietMs, but never later than maxMs
+READINESS_JS = """([hints, quietMs, maxMs, settleMs]) => new Promise(resolve => {
+    const start = performance.now();
+    const selector = hints.map(h => `[id*="${h}" i], [class*="${h}" i]`).join(', ');
+    let done = false;
+    let cmpFound = false;
+    let checkPending = false;
+    let quietTimer = null;
+
+    const finish = (reason) => {
+        if (done) {
+            return;
+        }
+        done = true;
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve({ reason: reason, waited_ms: Math.round(performance.now() - start) });
+    };
+
+    const checkCmp = () => {
+        if (cmpFound) {
+            return;
+        }
+        for (const el of document.querySelectorAll(selector)) {
+            if (el.offsetWidth || el.offsetHeight) {
+                cmpFound = true;
+                setTimeout(() => finish('cmp'), settleMs);
+                return;
+            }
+        }
+    };
+
+    const resetQuiet = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish('quiet'), quietMs);
+    };
+
+    // Throttle the CMP lookup, mutation callbacks can fire very often
+    const observer = new MutationObserver(() => {
+        if (!cmpFound) {
+            resetQuiet();
+        }
+        if (!checkPending) {
+            checkPending = true;
+            setTimeout(() => { checkPending = false; checkCmp(); }, 100);
+        }
+    });
+    const capTimer = setTimeout(() => finish('timeout'), maxMs);
+
+    observer.observe(document.documentElement, { childList: true, subtree: true, attributes: true });
+    resetQuiet();
+    checkCmp();
+})"""
 
 
 class BannerMonitor:
-    def __init__(self, data_dir="data/banner_data", verbose=False):
+    def __init__(self, data_dir="data/banner_data", verbose=False, quiet_ms=500, max_wait_ms=3000,
+                 settle_ms=300):
+        """
+        Args:
+            quiet_ms: DOM quiet period after which the page counts as ready
+            max_wait_ms: Longest wait before capturing (the old fixed wait)
+            settle_ms: Extra wait after a consent banner appears, for its animation
+        """
         self.screenshot_dir = os.path.join(data_dir, "screenshots")
         self.html_dir = os.path.join(data_dir, "html")
         self.verbose = verbose
+        self.quiet_ms = quiet_ms
+        self.max_wait_ms = max_wait_ms
+        self.settle_ms = settle_ms
         
         # Track completion by visit instead of a single flag
         self.completed_visits = set()
         
+        # How long the readiness wait took per capture, by domain and visit
+        self.readiness = {}
+        
+        # Files are written by one background thread so the crawl continues immediately
+        # (started on the first capture, stopped by close())
+        self._writer = None
+        self._pending_writes = []
+        
         # Ensure directories exist
         Path(self.screenshot_dir).mkdir(parents=True, exist_ok=True)
         Path(self.html_dir).mkdir(parents=True, exist_ok=True)
@@ -80,20 +157,64 @@ class BannerMonitor:
             'html_path': html_path
         }
     
+    async def _wait_until_ready(self, page):
+        """Wait for a consent banner or DOM quiescence, capped at max_wait_ms"""
+        try:
+            return await page.evaluate(READINESS_JS, [CMP_HINTS, self.quiet_ms, self.max_wait_ms, self.settle_ms])
+        except Exception as e:
+            # E.g. the page navigated while waiting; fall back to the fixed wait
+            if self.verbose:
+                print(f"Readiness check failed, waiting {self.max_wait_ms}ms: {e}")
+            await page.wait_for_timeout(self.max_wait_ms)
+            return {'reason': 'error', 'waited_ms': self.max_wait_ms}
+    
     async def _save_capture(self, page, paths):
         """Save screenshot and HTML"""
-        await page.wait_for_timeout(3000)
-       # Capture screenshot
-        await page.screenshot(path=paths['screenshot_path'], full_page=False)
+        visit_key = f"{self.domain}_{self.visit_number}_{self.extension_name}"
+        readiness = await self._wait_until_ready(page)
+        self.readiness.setdefault(self.domain, {})[str(self.visit_number)] = readiness
         
-        # Capture HTML
+        # Capture screenshot and HTML, the files are written in the background
+        screenshot = await page.screenshot(full_page=False)
         html_content = await page.content()
-        with open(paths['html_path'], 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        self._pending_writes.append(
+            self._get_writer().submit(self._write_files, paths, screenshot, html_content)
+        )
         
         if self.verbose:
-            print(f"Captured subpage for {self.domain}: {paths['filename']}")
+            print(f"Captured subpage for {self.domain}: {paths['filename']} "
+                  f"(ready after {readiness['waited_ms']}ms, {readiness['reason']})")
             
         # Mark this specific visit as complete
-        visit_key = f"{self.domain}_{self.visit_number}_{self.extension_name}"
-        self.completed_visits.add(visit_key)
\ No newline at end of file
+        self.completed_visits.add(visit_key)
+    
+    def _get_writer(self):
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='banner-writer')
+        return self._writer
+    
+    def _write_files(self, paths, screenshot, html_content):
+        """Write a capture to disk (runs on the writer thread)"""
+        with open(paths['screenshot_path'], 'wb') as f:
+            f.write(screenshot)
+        
+        with open(paths['html_path'], 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    
+    async def flush_writes(self):
+        """Wait until all queued captures are on disk"""
+        pending, self._pending_writes = self._pending_writes, []
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in pending), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error writing banner capture: {result}")
+    
+    def close(self):
+        """Stop the writer thread (call flush_writes() first), a later capture starts a new one"""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+    
+    def get_readiness(self, domain):
+        """Get the readiness wait ({reason, waited_ms}) of each captured visit of a domain"""
+        return self.readiness.get(domain, {})
@@ -0,0 +1,108 @@
+import os
+import random
+import hashlib
+import tempfile
+
+# Content-addressed store for response bodies, next to data/crawler_data
+BODY_BLOB_DIR = os.path.join('data', 'body_blobs')
+
+# How captured bodies are kept:
+#   'inline' - decoded into the request record (the original behavior)
+#   'blob'   - written to the blob store, the record references the sha256
+#   'hash'   - only the sha256 and size are recorded
+BODY_MODES = ('inline', 'blob', 'hash')
+
+
+class BlobStore:
+    """Stores bytes under their sha256 in 2-hex-digit shard directories"""
+
+    def __init__(self, root=BODY_BLOB_DIR):
+        self.root = root
+
+    def path(self, digest):
+        """Get the file path for a digest"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data, digest=None):
+        """Store data unless it is already present and return its sha256"""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so parallel crawlers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest):
+        """Read a stored blob, or None if it is missing"""
+        try:
+            with open(self.path(digest), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+class BodyCapturePolicy:
+    """
+    Decides which response bodies NetworkMonitor keeps and how.
+
+    Args:
+        mode: One of BODY_MODES
+        content_types: Substrings of the content-type to capture
+        resource_types: Playwright resource types to capture
+        max_bytes: Larger bodies are not kept (only their size, and hash when read)
+        sample_rate: Fraction of matching responses to capture
+        blob_dir: Blob store directory for 'blob' mode
+    """
+
+    def __init__(self, mode='blob', content_types=('json',), resource_types=('xhr', 'fetch'),
+                 max_bytes=1024 * 1024, sample_rate=1.0, blob_dir=BODY_BLOB_DIR):
+        if mode not in BODY_MODES:
+            raise ValueError(f"Unknown body capture mode '{mode}', expected one of {BODY_MODES}")
+        self.mode = mode
+        self.content_types = tuple(content_types)
+        self.resource_types = tuple(resource_types)
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.blob_store = BlobStore(blob_dir) if mode == 'blob' else None
+
+    def wants(self, resource_type, headers):
+        """Check whether a response body should be captured"""
+        if resource_type not in self.resource_types:
+            return False
+        content_type = headers.get('content-type', '')
+        if not any(wanted in content_type for wanted in self.content_types):
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def too_large(self, headers):
+        """Check the declared content-length against max_bytes before reading the body"""
+        try:
+            return self.max_bytes is not None and int(headers.get('content-length', 0)) > self.max_bytes
+        except ValueError:
+            return False
+
+    def apply(self, body, response_record):
+        """Keep a read body on the response record according to the policy"""
+        response_record.body_size = len(body)
+        if self.max_bytes is not None and len(body) > self.max_bytes:
+            response_record.body_sha256 = hashlib.sha256(body).hexdigest()
+            response_record.body_omitted = 'max_bytes'
+            return
+
+        if self.mode == 'inline':
+            response_record.body = body.decode('utf-8')
+        elif self.mode == 'blob':
+            response_record.body_sha256 = self.blob_store.put(body)
+        else:
+            response_record.body_sha256 = hashlib.sha256(body).hexdigest()
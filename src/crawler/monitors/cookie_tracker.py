@@ -0,0 +1,82 @@
+import time
+
+# Change log operations
+CREATED = 'created'
+DELETED = 'deleted'
+MODIFIED = 'modified'
+
+
+def cookie_key(cookie):
+    """Identity of a cookie; cookies with the same name on other domains/paths are different cookies"""
+    return (cookie['name'], cookie.get('domain', ''), cookie.get('path', '/'))
+
+
+class CookieTracker:
+    """
+    Tracks the cookie jar of one visit across page loads.
+
+    Each snapshot is diffed against the previous state in one pass, counting
+    created/deleted/modified cookies and appending them to a compact change log
+    of [seconds since the visit started, operation, name, domain, path] entries.
+    """
+
+    def __init__(self):
+        self._state = {}
+        self._seen = set()
+        self.created = 0
+        self.deleted = 0
+        self.modified = 0
+        self.change_log = []
+        self._start = time.monotonic()
+
+    def update(self, cookies):
+        """
+        Apply a snapshot from context.cookies()
+
+        Returns:
+            tuple: (created, deleted, modified) counts for this snapshot
+        """
+        now = round(time.monotonic() - self._start, 3)
+        previous = self._state
+        state = {}
+        created = modified = 0
+        log = self.change_log
+
+        for cookie in cookies:
+            key = cookie_key(cookie)
+            state[key] = cookie
+            old = previous.get(key)
+            if old is None:
+                created += 1
+                log.append([now, CREATED, *key])
+            elif old['value'] != cookie['value']:
+                modified += 1
+                log.append([now, MODIFIED, *key])
+
+        # Every previous cookie that is still present was matched above
+        still_present = len(state) - created
+        deleted = len(previous) - still_present
+        if deleted:
+            for key in previous:
+                if key not in state:
+                    log.append([now, DELETED, *key])
+
+        self._state = state
+        self._seen.update(state)
+        self.created += created
+        self.deleted += deleted
+        self.modified += modified
+        return created, deleted, modified
+
+    def cookies(self):
+        """Get the current cookies"""
+        return list(self._state.values())
+
+    def get_stats(self):
+        """Get the cookie operation counts for the visit"""
+        return {
+            'total_unique_cookies': len(self._seen),
+            'cookies_created': self.created,
+            'cookies_deleted': self.deleted,
+            'cookies_modified': self.modified
+        }
@@ -1,41 +1,108 @@
 // Fingerprint collection script
-// VISIT_NUMBER placeholder will be replaced during runtime
+// Runs inside the monitor bundle, see init_scripts.py
 
-window.currentPageIndex = 0;  // Default to 0 for homepage
-window.currentVisitNumber = VISIT_NUMBER;  // Will be replaced with actual visit number
+// Reports are buffered and sent to Python in batches, one binding call per flush
+const FP_MAX_BATCH = 50;
+const FP_FLUSH_INTERVAL_MS = 1000;
+
+// First script URL in a stack trace (our hooks are injected without a URL)
+const FP_SCRIPT_URL = /((?:https?|chrome-extension):\/\/[^\s()]+?):\d+:\d+/;
+
+// URL of the script calling a hooked API, or null if it can't be determined
+function callingScript() {
+    const stack = new Error().stack || '';
+    const match = FP_SCRIPT_URL.exec(stack);
+    return match ? match[1] : null;
+}
 
 window.fpCollector = {
+    // Each (category, api) pair is counted once per page load
     calls: new Set(),
-
-    // Report API usage to Python
+    // Calls per (category, api), stacks are only sampled on calls 1, 2, 4, 8, ...
+    callCounts: new Map(),
+    // (category, api, script) combinations already reported
+    scripts: new Set(),
+    pending: [],
+    pendingUrl: null,
+    flushScheduled: false,
+
+    // Queue API usage for Python
     report(category, api, value) {
-        // Skip duplicate calls
         const callKey = `${category}:${api}`;
-        if (this.calls.has(callKey)) {
+        const count = (this.callCounts.get(callKey) || 0) + 1;
+        this.callCounts.set(callKey, count);
+
+        // Skip duplicate calls, unless sampled for script attribution
+        const first = !this.calls.has(callKey);
+        if (!first && (count & (count - 1)) !== 0) {
+            return;
+        }
+
+        const script = callingScript();
+        const scriptKey = `${callKey}:${script}`;
+        if (this.scripts.has(scriptKey)) {
             return;
         }
+        this.scripts.add(scriptKey);
         this.calls.add(callKey);
-        
-        
+
+        // A batch belongs to one URL, so flush when it changes (e.g. history.pushState)
+        const url = window.location.href;
+        if (url !== this.pendingUrl) {
+            this.flush();
+            this.pendingUrl = url;
+        }
+
+        // first marks the entry that counts towards the per-page API counts
+        this.pending.push([category, api, script, first ? 1 : 0]);
+        if (this.pending.length >= FP_MAX_BATCH) {
+            this.flush();
+        } else {
+            this.scheduleFlush();
+        }
+    },
+
+    // Flush when the page is idle (or after the interval if it never is)
+    scheduleFlush() {
+        if (this.flushScheduled) {
+            return;
+        }
+        this.flushScheduled = true;
+        const run = () => {
+            this.flushScheduled = false;
+            this.flush();
+        };
+        if (window.requestIdleCallback) {
+            window.requestIdleCallback(run, { timeout: FP_FLUSH_INTERVAL_MS });
+        } else {
+            setTimeout(run, FP_FLUSH_INTERVAL_MS);
+        }
+    },
+
+    // Report queued API usage to Python, returns a promise resolved once Python has handled it
+    flush() {
+        // Keep the queue until the binding is available
+        if (!this.pending.length || typeof window.reportFPCall !== 'function') {
+            return;
+        }
+        const calls = this.pending;
+        this.pending = [];
         try {
-            // Get current URL
-            const url = window.location.href;
-            
-            // Report to Python
-            window.reportFPCall({
-                category: category,
-                api: api,
-                value: value ? String(value).substring(0, 100) : "",
-                url: url,
-                visit: window.currentVisitNumber
+            return window.reportFPCall({
+                url: this.pendingUrl,
+                visit: window.__monitorVisit,
+                calls: calls
             });
         } catch (e) {
             // Ignore reporting errors
-            console.error("Error reporting fingerprinting call:", e);
+            console.error("Error reporting fingerprinting calls:", e);
         }
     }
 };
 
+setInterval(() => fpCollector.flush(), FP_FLUSH_INTERVAL_MS);
+window.addEventListener('pagehide', () => fpCollector.flush());
+
 // Canvas fingerprinting
 const originalGetContext = HTMLCanvasElement.prototype.getContext;
 HTMLCanvasElement.prototype.getContext = function() {
@@ -1,8 +1,8 @@
 from datetime import datetime
 from typing import Dict, List, Set, Counter
 from collections import defaultdict, Counter
-from urllib.parse import urlparse
-from pathlib import Path
+from crawler.monitors.init_scripts import InitScriptRegistry
+from utils.urlkit import url_netloc, url_origin, url_without_query
 
 class FingerprintCollector:
     def __init__(self, verbose=False):
@@ -13,86 +13,97 @@ class FingerprintCollector:
         
         # Keep the script patterns global
         self.script_patterns = {}
-        
-        # Load the JavaScript file
-        script_path = Path(__file__).parent / "fingerprint_collector.js"
-        with open(script_path, 'r') as f:
-            self.monitor_js = f.read()
 
-    async def setup_monitoring(self, page, visit_number=0):
-        """Setup monitoring before page loads"""
+    async def setup_monitoring(self, page, visit_number=0, scripts=None):
+        """
+        Setup monitoring before page loads
+
+        With a shared InitScriptRegistry the script is only registered and the caller
+        installs the bundle; otherwise it is installed on the page's context directly.
+        """
         if self.verbose:
             print(f"Setting up fingerprint collection for visit #{visit_number+1}...")
         self.current_visit = visit_number
         
         # Initialize data structure for this visit if it doesn't exist
         if visit_number not in self.visits_data:
-            self.visits_data[visit_number] = {
-                'page_data': defaultdict(lambda: {
-                    'api_counts': Counter(),
-                    'categories': Counter(),
-                }),
-                'category_counts': Counter()
-            }
-
-        # Replace the visit number placeholder in the JavaScript
-        js_code = self.monitor_js.replace('VISIT_NUMBER', str(visit_number))
+            self.visits_data[visit_number] = self._new_visit_data()
 
-        # Inject our monitoring code
-        await page.add_init_script(js_code)
+        # Inject our monitoring code and setup callback from JavaScript.
+        # Reports carry the visit set by InitScriptRegistry.install, current_visit is the fallback
+        registry = scripts or InitScriptRegistry()
+        registry.add_script('fingerprint')
+        registry.add_binding('reportFPCall', self._handle_fp_call)
+        if scripts is None:
+            await registry.install(page.context, visit_number)
 
-        # Setup callback from JavaScript
-        await page.expose_function('reportFPCall', self._handle_fp_call)
+    async def flush_reports(self, page):
+        """Send the reports still queued in the page's frames, call before reading the visit's data"""
+        for frame in page.frames:
+            try:
+                await frame.evaluate("() => window.fpCollector && window.fpCollector.flush()")
+            except Exception as e:
+                # Detached or navigating frames have nothing left to report
+                if self.verbose:
+                    print(f"Could not flush fingerprint reports in {frame.url}: {e}")
 
     def _normalize_url(self, url):
         """Normalize URL by removing parameters"""
-        try:
-            parsed = urlparse(url)
-            return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-        except:
-            return url
+        return url_without_query(url)
+
+    def _new_visit_data(self):
+        """Create the empty aggregation structure for a visit"""
+        return {
+            'page_data': defaultdict(lambda: {
+                'api_counts': Counter(),
+                'categories': Counter(),
+                # (script origin, api) -> number of distinct calling script URLs
+                'api_scripts': Counter(),
+            }),
+            'category_counts': Counter()
+        }
+
+    async def _handle_fp_call(self, batch):
+        """
+        Process a batch of fingerprinting API calls with aggregation
 
-    async def _handle_fp_call(self, call_data):
-        """Process fingerprinting API calls with aggregation"""
-        category = call_data['category']
-        api = call_data['api']
-        url = self._normalize_url(call_data['url'])
-        visit = call_data.get('visit', self.current_visit)
+        fingerprint_collector.js sends {url, visit, calls} where calls is a list of
+        [category, api, script URL, first] entries. Entries with first set are the
+        once-per-page-load API counts; the others only attribute an API to another
+        calling script (found by sampling stack traces).
+        """
+        url = self._normalize_url(batch['url'])
+        visit = batch.get('visit', self.current_visit)
+        calls = batch['calls']
         
         # Make sure this visit exists in our data structure
         if visit not in self.visits_data:
-            self.visits_data[visit] = {
-                'page_data': defaultdict(lambda: {
-                    'api_counts': Counter(),
-                    'categories': Counter(),
-                }),
-                'category_counts': Counter()
-            }
+            self.visits_data[visit] = self._new_visit_data()
         
         # Get the data for this visit
         visit_data = self.visits_data[visit]
+        page_data = visit_data['page_data'][url]
+        counted = [(category, api) for category, api, _, first in calls if first]
+        categories = Counter(category for category, _ in counted)
         
-        # Increment API call count for this page
-        visit_data['page_data'][url]['api_counts'][api] += 1
+        # Increment API call and category counts for this page
+        page_data['api_counts'].update(api for _, api in counted)
+        page_data['categories'].update(categories)
         
-        # Increment category count for this page
-        visit_data['page_data'][url]['categories'][category] += 1
+        # Each entry is a distinct (api, script URL) pair of one page load, count them per script origin
+        page_data['api_scripts'].update(
+            (url_origin(script) if script else 'unknown', api) for _, api, script, _ in calls
+        )
         
         # Update global category counts for this visit
-        visit_data['category_counts'][category] += 1
+        visit_data['category_counts'].update(categories)
 
     def _get_results_for_visit(self, visit_number):
         """Get fingerprinting results for a specific visit"""
         # If this visit doesn't exist in our data, create an empty structure
         if visit_number not in self.visits_data:
             print(f"Warning: No fingerprinting data for visit {visit_number}, creating empty result")
-            self.visits_data[visit_number] = {
-                'page_data': defaultdict(lambda: {
-                    'api_counts': Counter(),
-                    'categories': Counter(),
-                }),
-                'category_counts': Counter()
-            }
+            self.visits_data[visit_number] = self._new_visit_data()
         
         visit_data = self.visits_data[visit_number]
         page_data = visit_data['page_data']
@@ -103,13 +114,23 @@ class FingerprintCollector:
         domain_category_counts = Counter()
         
         for url, data in page_data.items():
-            domain = urlparse(url).netloc
+            domain = url_netloc(url)
             domain_api_counts.update(data['api_counts'])
             domain_category_counts.update(data['categories'])
         
         # Calculate total calls
         total_calls = sum(domain_api_counts.values())
         
+        # Number of distinct scripts per page, script origin and api (summed over page loads).
+        # These are not call counts: each script is reported once per api and page load
+        api_scripts = {}
+        for url, data in page_data.items():
+            if not data['api_scripts']:
+                continue
+            origins = api_scripts[url] = {}
+            for (origin, api), count in data['api_scripts'].items():
+                origins.setdefault(origin, {})[api] = count
+        
         # Create technique breakdown by aggregating categories
         technique_breakdown = {
             'canvas': domain_category_counts.get('canvas', 0),
@@ -140,7 +161,8 @@ class FingerprintCollector:
                 'total_calls': total_calls,
                 'technique_breakdown': technique_breakdown,
                 'api_breakdown': dict(domain_api_counts)
-            }
+            },
+            'api_scripts': api_scripts
         }
     
     def _get_combined_results(self):
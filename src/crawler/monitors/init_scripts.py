@@ -0,0 +1,103 @@
+import json
+import weakref
+from functools import lru_cache
+from pathlib import Path
+
+# Monitor scripts that can be part of the injected bundle
+SCRIPT_FILES = {
+    'fingerprint': 'fingerprint_collector.js',
+    'storage': 'storage_monitor.js'
+}
+
+# Script names and binding names already installed per browser context
+_installed = weakref.WeakKeyDictionary()
+
+
+def _minify(source):
+    """Drop indentation, blank lines and full-line comments"""
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+@lru_cache(maxsize=None)
+def load_script(name):
+    """Read and minify a monitor script, once per process"""
+    with open(Path(__file__).parent / SCRIPT_FILES[name], 'r') as f:
+        return _minify(f.read())
+
+
+@lru_cache(maxsize=None)
+def _bundle_source(names):
+    """
+    Combine scripts into one function taking the config object
+
+    Each script runs in its own block with its own `config` (the entry for its
+    name), so one failing script does not stop the others.
+    """
+    parts = [
+        f"try {{\nconst config = monitorConfig[{json.dumps(name)}] || {{}};\n{load_script(name)}\n}} "
+        f"catch (e) {{ console.error({json.dumps(name + ' monitor failed:')}, e); }}"
+        for name in names
+    ]
+    return "(function(monitorConfig) {\n" + "\n".join(parts) + "\n})"
+
+
+def render_bundle(config):
+    """
+    Get the bundle source for a {script name: config} mapping
+
+    Only the config is rendered per call, the combined scripts are cached.
+    """
+    return f"{_bundle_source(tuple(config))}({json.dumps(config)});"
+
+
+class InitScriptRegistry:
+    """
+    Collects the init scripts and exposed bindings of the monitors for a visit
+    and installs them as one bundle on the browser context.
+
+    Usage:
+        scripts = InitScriptRegistry()
+        await monitor.setup_monitoring(page, visit, scripts=scripts)
+        await scripts.install(page.context, visit)
+    """
+
+    def __init__(self):
+        self.scripts = {}
+        self.bindings = {}
+
+    def add_script(self, name, config=None):
+        """Add a monitor script (see SCRIPT_FILES) with its config object"""
+        self.scripts[name] = config or {}
+
+    def add_binding(self, name, callback):
+        """Add a Python function exposed to the page as window.<name>"""
+        self.bindings[name] = callback
+
+    async def install(self, context, visit=None):
+        """
+        Expose the bindings and add the bundle to a browser context
+
+        Scripts and bindings already installed on the context (e.g. a Kameleo
+        profile reused across visits) are skipped, since init scripts cannot be
+        removed and bindings cannot be registered twice.
+
+        The visit number is set as window.__monitorVisit in every new document, so
+        reports sent late (e.g. on pagehide when the next visit navigates a reused
+        context) are still credited to the visit that loaded the page.
+        """
+        installed = _installed.setdefault(context, set())
+
+        if visit is not None:
+            # Added every visit; init scripts run in order, so the latest visit wins
+            await context.add_init_script(f"window.__monitorVisit = {int(visit)};")
+
+        for name, callback in self.bindings.items():
+            if name not in installed:
+                await context.expose_function(name, callback)
+                installed.add(name)
+
+        config = {name: cfg for name, cfg in self.scripts.items() if name not in installed}
+        if config:
+            await context.add_init_script(render_bundle(config))
+            installed.update(config)
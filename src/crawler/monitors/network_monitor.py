@@ -1,56 +1,113 @@
 from datetime import datetime, timedelta
-from urllib.parse import urlparse, parse_qs
 import json
 import base64
 from typing import Dict, Set, List
 from collections import defaultdict
 import asyncio
+import time
 from tqdm import tqdm
+from utils.urlkit import url_netloc
+from crawler.monitors.request_record import RequestRecord, ResponseRecord, HeaderInterner
+from crawler.monitors.cookie_tracker import CookieTracker
+from crawler.monitors.body_capture import BodyCapturePolicy
+
+# How requests are captured:
+#   'route'  - intercept every request with page.route and fetch/fulfill it from Python
+#   'events' - observe request/requestfinished/requestfailed events without intercepting traffic
+CAPTURE_MODES = ('route', 'events')
 
 class NetworkMonitor:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, capture_mode='route', body_policy=None):
+        if capture_mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode '{capture_mode}', expected one of {CAPTURE_MODES}")
+        self.capture_mode = capture_mode
+        # Which response bodies are kept, and how (JSON xhr/fetch bodies into the blob store by default)
+        self.body_policy = body_policy or BodyCapturePolicy()
+        # Compact RequestRecords of the current visit, converted to dicts in _get_network_data
         self.requests = []
         self.domains_contacted = set()
-        self.cookies_by_visit = {}
+        self.current_visit = None
+        # Request statistics of earlier visits, kept after their requests are dropped
+        self._visit_stats = {}
+        # Header sets shared between request and response records
+        self._headers = HeaderInterner()
         self.verbose = verbose
         
-        # Track cookie operations per visit
-        self.cookie_stats = defaultdict(lambda: {
-            'created': 0,
-            'deleted': 0,
-            'modified': 0,
-            'cookies_seen': set(),
-            'cookies_deleted': set()
-        })
+        # Track cookies and cookie operations per visit
+        self.cookie_trackers = {}
         self._route_handler_ref = None
         self._load_handler_ref = None
+        self._event_handler_refs = {}
+        # Records of requests that have not finished yet (events mode)
+        self._pending_requests = {}
+        # In-flight requests and the time of the last request start/end, for page readiness
+        self.inflight = 0
+        self.last_activity = time.monotonic()
 
     def _log(self, message):
         if self.verbose:
             tqdm.write(f"  [NetworkMonitor] {message}")
 
-    def _count_request_types(self):
+    def _count_request_types(self, requests):
         """Count requests by type"""
         type_counts = defaultdict(int)
-        for request in self.requests:
-            req_type = request.get('type', 'unknown')
-            type_counts[req_type] += 1
+        for request in requests:
+            type_counts[request.resource_type] += 1
         return dict(type_counts)
 
+    def _compute_visit_stats(self):
+        """Request statistics for the current visit"""
+        return {
+            'total_requests': len(self.requests),
+            'request_types': self._count_request_types(self.requests)
+        }
+
+    def start_visit(self, visit_number):
+        """
+        Roll over to a new visit's request buffer
+
+        The previous visit's requests are dropped (collect them with get_results()
+        first), only their statistics are kept.
+        """
+        if visit_number == self.current_visit:
+            return
+        if self.current_visit is not None:
+            self._visit_stats[self.current_visit] = self._compute_visit_stats()
+        self.current_visit = visit_number
+        self.requests = []
+        self.domains_contacted = set()
+        self._pending_requests = {}
+        self._headers.clear()
+        self.inflight = 0
+        self.last_activity = time.monotonic()
+
+    def _request_started(self):
+        self.inflight += 1
+        self.last_activity = time.monotonic()
+
+    def _request_ended(self):
+        self.inflight = max(0, self.inflight - 1)
+        self.last_activity = time.monotonic()
+
+    def quiet_for(self, max_inflight=0):
+        """
+        Seconds since the last request started or ended, or 0 while more than
+        max_inflight requests are in flight
+        """
+        if self.inflight > max_inflight:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
     def get_cookies(self):
-        """Get cookies collected during visits"""
-        return self.cookies_by_visit
+        """Get cookies collected during visits (final cookie jar per visit)"""
+        return {visit: tracker.cookies() for visit, tracker in self.cookie_trackers.items()}
 
     def get_cookie_stats(self):
-        """Get statistics about cookie operations during visits"""
+        """Get statistics and the change log of cookie operations during visits"""
         stats = {}
-        for visit, data in self.cookie_stats.items():
-            stats[visit] = {
-                'total_unique_cookies': len(data['cookies_seen']),
-                'cookies_created': data['created'],
-                'cookies_deleted': data['deleted'],
-                'cookies_modified': data['modified']
-            }
+        for visit, tracker in self.cookie_trackers.items():
+            stats[visit] = tracker.get_stats()
+            stats[visit]['change_log'] = tracker.change_log
         return stats
 
     def get_storage_data(self):
@@ -67,117 +124,45 @@ class NetworkMonitor:
     async def setup_monitoring(self, page, visit_number=0):
         """Setup network monitoring for a new page/visit"""
         self._log(f"Starting network monitor for visit {visit_number}")
+        self.start_visit(visit_number)
         
         async def capture_cookies_handler():
             try:
                 current_cookies = await page.context.cookies()
                 
-                if visit_number not in self.cookies_by_visit:
-                    # First page load in this visit
-                    self.cookies_by_visit[visit_number] = current_cookies
-                    self.cookie_stats[visit_number]['created'] = len(current_cookies)
-                    self.cookie_stats[visit_number]['cookies_seen'].update(c['name'] for c in current_cookies)
-                else:
-                    # Compare with previous state
-                    previous_cookies = {c['name']: c for c in self.cookies_by_visit[visit_number]}
-                    current_cookie_dict = {c['name']: c for c in current_cookies}
-                    
-                    # Check for new cookies
-                    new_cookies = set(current_cookie_dict.keys()) - set(previous_cookies.keys())
-                    self.cookie_stats[visit_number]['created'] += len(new_cookies)
-                    
-                    # Check for deleted cookies
-                    deleted_cookies = set(previous_cookies.keys()) - set(current_cookie_dict.keys())
-                    self.cookie_stats[visit_number]['deleted'] += len(deleted_cookies)
-                    
-                    # Check for modified cookies
-                    for name in set(previous_cookies.keys()) & set(current_cookie_dict.keys()):
-                        if previous_cookies[name]['value'] != current_cookie_dict[name]['value']:
-                            self.cookie_stats[visit_number]['modified'] += 1
-                    
-                    # Update current state
-                    self.cookies_by_visit[visit_number] = current_cookies
-                    self.cookie_stats[visit_number]['cookies_seen'].update(c['name'] for c in current_cookies)
+                # Diff against the previous state of this visit (all cookies count as created on the first load)
+                tracker = self.cookie_trackers.get(visit_number)
+                if tracker is None:
+                    tracker = self.cookie_trackers[visit_number] = CookieTracker()
+                tracker.update(current_cookies)
             
             except Exception as e:
                 self._log(f"Warning: Error capturing cookies: {e}")
 
         async def route_handler(route):
             request = route.request
+            self._request_started()
             try:
-                url = request.url
-                domain = self._extract_domain(url)
-                
-                # Record detailed request info
-                request_data = {
-                    "url": url,
-                    "domain": domain,
-                    "type": request.resource_type,
-                    "resource_type": request.resource_type,
-                    "method": request.method,
-                    "headers": dict(request.headers),
-                    "timestamp": datetime.now().isoformat(),
-                    "visit_number": visit_number,
-                    "post_data": None,  # Default to None
-                    "frame_url": request.frame.url if request.frame else None,
-                    "is_navigation": request.is_navigation_request()
-                }
-                
-                # Safely handle post data
-                if request.method == "POST":
-                    try:
-                        post_data = request.post_data
-                        request_data["post_data"] = post_data
-                    except UnicodeDecodeError:
-                        request_data["post_data"] = "[BINARY_DATA]"
-                    except Exception as e:
-                        if "Request context is missing" not in str(e):
-                            request_data["post_data"] = f"[ERROR accessing post_data: {str(e)}]"
-                        else:
-                            request_data["post_data"] = "[INFO: Request context missing, likely during teardown]"
-                
-                self.requests.append(request_data)
-                self.domains_contacted.add(domain)
+                request_data = self._record_request(request, visit_number)
                 
                 # Handle response
                 try:
                     response = await route.fetch()
                     
                     # Capture response data
-                    response_data = {
-                        "status": response.status,
-                        "status_text": response.status_text,
-                        "headers": dict(response.headers),
-                        "security_details": None
-                    }
-                    sec_details = response.security_details
-                    if sec_details:
-                        response_data["security_details"] = {
-                            "protocol": sec_details.protocol,
-                            "subjectName": sec_details.subject_name
-                        }
-                    
-                    if self.requests:
-                        self.requests[-1]["response"] = response_data
-                        
-                        if request.resource_type in ['xhr', 'fetch'] and 'json' in response.headers.get('content-type', ''):
-                            try:
-                                body = await response.body()
-                                self.requests[-1]["response"]["body"] = body.decode('utf-8')
-                            except Exception as e:
-                                self.requests[-1]["response"]["body_error"] = str(e)
+                    request_data.response = self._build_response_record(
+                        response.status, response.status_text, response.headers, response.security_details
+                    )
+                    await self._capture_body(request, response, request_data.response)
                     
                     await route.fulfill(response=response)
                     
                 except Exception as e:
                     if "Request context is missing" not in str(e) and "Target page, context or browser has been closed" not in str(e):
-                        error_msg = f"Error fetching/fulfilling response for {url}: {str(e)}"
+                        error_msg = f"Error fetching/fulfilling response for {request.url}: {str(e)}"
                         self._log(f"  [NetworkMonitor] {error_msg}")
-                        if self.requests:
-                            self.requests[-1]["error"] = error_msg
-                        await route.continue_()
-                    else:
-                        await route.continue_()
+                        request_data.error = error_msg
+                    await route.continue_()
             
             except Exception as e:
                 if "Request context is missing" not in str(e) and "Target page, context or browser has been closed" not in str(e):
@@ -186,40 +171,164 @@ class NetworkMonitor:
                     await route.continue_()
                 except Exception:
                     pass
+            finally:
+                self._request_ended()
+
+        def request_handler(request):
+            self._request_started()
+            try:
+                self._pending_requests[request] = self._record_request(request, visit_number)
+            except Exception as e:
+                self._log(f"Unexpected error recording request {request.url}: {e}")
+
+        async def request_finished_handler(request):
+            self._request_ended()
+            request_data = self._pending_requests.pop(request, None)
+            if request_data is None:
+                return
+            try:
+                response = await request.response()
+                if response is None:
+                    return
+                
+                try:
+                    security_details = await response.security_details()
+                except Exception:
+                    security_details = None
+                request_data.response = self._build_response_record(
+                    response.status, response.status_text, response.headers, security_details
+                )
+                await self._capture_body(request, response, request_data.response)
+            
+            except Exception as e:
+                if "Target page, context or browser has been closed" not in str(e):
+                    request_data.error = f"Error reading response for {request.url}: {str(e)}"
+
+        def request_failed_handler(request):
+            self._request_ended()
+            request_data = self._pending_requests.pop(request, None)
+            if request_data is not None:
+                request_data.error = f"Request failed for {request.url}: {request.failure}"
 
-        self._route_handler_ref = route_handler
         self._load_handler_ref = capture_cookies_handler
 
-        try:
-            await page.route("**", self._route_handler_ref)
-        except Exception as e:
-            tqdm.write(f"  [NetworkMonitor] Warning: Failed to set up routing: {e}")
+        if self.capture_mode == 'route':
+            self._route_handler_ref = route_handler
+            try:
+                await page.route("**", self._route_handler_ref)
+            except Exception as e:
+                tqdm.write(f"  [NetworkMonitor] Warning: Failed to set up routing: {e}")
+        else:
+            # Observe traffic without intercepting it, the browser loads pages as usual
+            self._event_handler_refs = {
+                'request': request_handler,
+                'requestfinished': request_finished_handler,
+                'requestfailed': request_failed_handler
+            }
+            try:
+                for event, handler in self._event_handler_refs.items():
+                    page.on(event, handler)
+            except Exception as e:
+                tqdm.write(f"  [NetworkMonitor] Warning: Failed to set up request listeners: {e}")
 
         try:
             page.on('load', self._load_handler_ref)
         except Exception as e:
             tqdm.write(f"  [NetworkMonitor] Warning: Failed to set up load listener: {e}")
 
+    def _record_request(self, request, visit_number):
+        """Record a request and return its record"""
+        url = request.url
+        domain = self._extract_domain(url)
+        
+        # Record detailed request info
+        request_data = RequestRecord(
+            url=url,
+            domain=domain,
+            resource_type=request.resource_type,
+            method=request.method,
+            headers=self._headers.intern(request.headers),
+            visit_number=visit_number,
+            frame_url=request.frame.url if request.frame else None,
+            is_navigation=request.is_navigation_request()
+        )
+        
+        # Safely handle post data
+        if request.method == "POST":
+            try:
+                post_data = request.post_data
+                request_data.post_data = post_data
+            except UnicodeDecodeError:
+                request_data.post_data = "[BINARY_DATA]"
+            except Exception as e:
+                if "Request context is missing" not in str(e):
+                    request_data.post_data = f"[ERROR accessing post_data: {str(e)}]"
+                else:
+                    request_data.post_data = "[INFO: Request context missing, likely during teardown]"
+        
+        self.requests.append(request_data)
+        self.domains_contacted.add(domain)
+        return request_data
+
+    def _build_response_record(self, status, status_text, headers, sec_details):
+        """Build the response part of a request record"""
+        security_details = None
+        if sec_details:
+            # Route responses expose attributes, page responses a dict
+            if isinstance(sec_details, dict):
+                security_details = {
+                    "protocol": sec_details.get("protocol"),
+                    "subjectName": sec_details.get("subjectName")
+                }
+            else:
+                security_details = {
+                    "protocol": sec_details.protocol,
+                    "subjectName": sec_details.subject_name
+                }
+        return ResponseRecord(status, status_text, self._headers.intern(headers), security_details)
+
+    async def _capture_body(self, request, response, response_record):
+        """Read the response body and keep it as the body capture policy says"""
+        policy = self.body_policy
+        if not policy.wants(request.resource_type, response.headers):
+            return
+        if policy.too_large(response.headers):
+            # Don't read bodies that are declared too large at all
+            response_record.body_omitted = 'max_bytes'
+            return
+        try:
+            body = await response.body()
+            policy.apply(body, response_record)
+        except Exception as e:
+            response_record.body_error = str(e)
+
     def _extract_domain(self, url):
         """Extract domain from URL"""
-        try:
-            from urllib.parse import urlparse
-            return urlparse(url).netloc
-        except:
-            return url.split('/')[2] if '://' in url else url.split('/')[0]
+        return url_netloc(url)
     
     def get_statistics(self):
-        """Get computed statistics from network data (private)"""
+        """Get computed statistics from network data, totals over all visits plus per-visit counts"""
+        visits = dict(self._visit_stats)
+        if self.current_visit is not None:
+            visits[self.current_visit] = self._compute_visit_stats()
+        
+        request_types = defaultdict(int)
+        for stats in visits.values():
+            for req_type, count in stats['request_types'].items():
+                request_types[req_type] += count
+        
         return {
-            'total_requests': len(self.requests),
-            'request_types': self._count_request_types(),
-            'cookie_operations': self.get_cookie_stats()
+            'total_requests': sum(stats['total_requests'] for stats in visits.values()),
+            'request_types': dict(request_types),
+            'cookie_operations': self.get_cookie_stats(),
+            'visits': {str(visit): stats for visit, stats in visits.items()}
         }
     
     def _get_network_data(self):
-        """Get raw network request data (private)"""
+        """Get the current visit's raw network request data (private)"""
         return {
-            'requests': self.requests,
+            # Compact records are converted to the stored JSON shape here
+            'requests': [request.to_dict() for request in self.requests],
             'domains_contacted': list(self.domains_contacted)
         }
 
@@ -239,6 +348,18 @@ class NetworkMonitor:
                 # Always clear the reference to prevent potential issues
                 self._route_handler_ref = None
 
+        # Remove request event listeners (events mode)
+        for event, handler in self._event_handler_refs.items():
+            try:
+                page.remove_listener(event, handler)
+            except Exception as e:
+                if "Target page" not in str(e) and "context" not in str(e):
+                    tqdm.write(f"  [NetworkMonitor] Warning: Error removing {event} listener: {e}")
+        if self._event_handler_refs:
+            self._log("Successfully removed request listeners.")
+        self._event_handler_refs = {}
+        self._pending_requests = {}
+
         # check if the load handler ref exists before attempting to remove
         if self._load_handler_ref:
             try:
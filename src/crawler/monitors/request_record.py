@@ -0,0 +1,141 @@
+import sys
+import time
+from datetime import datetime
+
+# Playwright resource types, stored in records as small integer codes
+RESOURCE_TYPES = [
+    'document', 'stylesheet', 'image', 'media', 'font', 'script', 'texttrack', 'xhr', 'fetch',
+    'eventsource', 'websocket', 'manifest', 'other', 'ping', 'prefetch', 'preflight', 'cspviolationreport'
+]
+_RESOURCE_TYPE_CODES = {name: code for code, name in enumerate(RESOURCE_TYPES)}
+
+# Wall clock time at a known monotonic time, to convert record timestamps back to dates
+_WALL_ANCHOR = time.time()
+_MONOTONIC_ANCHOR = time.monotonic()
+
+
+def resource_type_code(resource_type):
+    """Get the code for a resource type, adding types Playwright may introduce later"""
+    code = _RESOURCE_TYPE_CODES.get(resource_type)
+    if code is None:
+        code = len(RESOURCE_TYPES)
+        RESOURCE_TYPES.append(resource_type)
+        _RESOURCE_TYPE_CODES[resource_type] = code
+    return code
+
+
+def timestamp_to_iso(monotonic_time):
+    """Convert a time.monotonic() timestamp to a local ISO timestamp like datetime.now().isoformat()"""
+    return datetime.fromtimestamp(_WALL_ANCHOR + (monotonic_time - _MONOTONIC_ANCHOR)).isoformat()
+
+
+class HeaderInterner:
+    """
+    Shares header data between records.
+
+    Headers are stored as tuples of (name, value) pairs with interned strings,
+    and identical header sets (very common across a page's requests) are stored once.
+    """
+
+    def __init__(self):
+        self._header_sets = {}
+
+    def intern(self, headers):
+        """Get the shared tuple for a header dict"""
+        items = tuple((sys.intern(name), sys.intern(value)) for name, value in headers.items())
+        return self._header_sets.setdefault(items, items)
+
+    def clear(self):
+        """Forget all header sets"""
+        self._header_sets = {}
+
+
+class ResponseRecord:
+    """Compact response part of a RequestRecord"""
+
+    __slots__ = ('status', 'status_text', 'headers', 'security_details', 'body', 'body_error',
+                 'body_sha256', 'body_size', 'body_omitted')
+
+    def __init__(self, status, status_text, headers, security_details=None):
+        self.status = status
+        self.status_text = status_text
+        self.headers = headers
+        self.security_details = security_details
+        self.body = None
+        self.body_error = None
+        # Set by the body capture policy when the body is stored by hash or left out
+        self.body_sha256 = None
+        self.body_size = None
+        self.body_omitted = None
+
+    def to_dict(self):
+        """Convert to the JSON shape stored in crawl files"""
+        data = {
+            "status": self.status,
+            "status_text": self.status_text,
+            "headers": dict(self.headers),
+            "security_details": self.security_details
+        }
+        if self.body is not None:
+            data["body"] = self.body
+        if self.body_error is not None:
+            data["body_error"] = self.body_error
+        for key in ('body_sha256', 'body_size', 'body_omitted'):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+
+class RequestRecord:
+    """
+    Compact record of one captured request.
+
+    Resource types are stored as codes, headers as shared tuples (see HeaderInterner)
+    and the timestamp as time.monotonic(); to_dict() restores the JSON shape.
+    """
+
+    __slots__ = ('url', 'domain', 'type_code', 'method', 'headers', 'timestamp', 'visit_number',
+                 'post_data', 'frame_url', 'is_navigation', 'response', 'error')
+
+    def __init__(self, url, domain, resource_type, method, headers, visit_number, frame_url=None,
+                 is_navigation=False, timestamp=None):
+        self.url = url
+        self.domain = domain
+        self.type_code = resource_type_code(resource_type)
+        self.method = method
+        self.headers = headers
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.visit_number = visit_number
+        self.post_data = None
+        self.frame_url = frame_url
+        self.is_navigation = is_navigation
+        self.response = None
+        self.error = None
+
+    @property
+    def resource_type(self):
+        """Playwright resource type name"""
+        return RESOURCE_TYPES[self.type_code]
+
+    def to_dict(self):
+        """Convert to the JSON shape stored in crawl files"""
+        resource_type = self.resource_type
+        data = {
+            "url": self.url,
+            "domain": self.domain,
+            "type": resource_type,
+            "resource_type": resource_type,
+            "method": self.method,
+            "headers": dict(self.headers),
+            "timestamp": timestamp_to_iso(self.timestamp),
+            "visit_number": self.visit_number,
+            "post_data": self.post_data,
+            "frame_url": self.frame_url,
+            "is_navigation": self.is_navigation
+        }
+        if self.response is not None:
+            data["response"] = self.response.to_dict()
+        if self.error is not None:
+            data["error"] = self.error
+        return data
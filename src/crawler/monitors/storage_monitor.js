@@ -1,3 +1,6 @@
+// Storage API monitor
+// Runs inside the monitor bundle, see init_scripts.py (config.push enables push mode)
+
 (function() {
     // Create counter object if it doesn't exist
     if (!window._storageMonitor) {
@@ -5,7 +8,10 @@
             localStorage: { getItem: 0, setItem: 0, removeItem: 0, clear: 0 },
             sessionStorage: { getItem: 0, setItem: 0, removeItem: 0, clear: 0 },
             initialized: new Date().toISOString(),
-            apiCalls: []
+            apiCalls: [],
+            // Mutations waiting to be pushed to Python (push mode only)
+            pending: [],
+            flush: function() {}
         };
     }
     
@@ -28,6 +34,49 @@
         if (window._storageMonitor.apiCalls.length > 50) {
             window._storageMonitor.apiCalls.pop();
         }
+        
+        // Queue mutations for the Python side in push mode
+        if (config.push && method !== 'getItem') {
+            queueMutation(type, method, key, value);
+        }
+    }
+    
+    // Push mode: mutations are batched and sent through one exposed binding
+    const MAX_BATCH = 100;
+    const FLUSH_INTERVAL_MS = 1000;
+    const MAX_VALUE_LENGTH = 1024;
+    
+    // Returns a promise resolved once Python has handled the batch
+    function flushMutations() {
+        const monitor = window._storageMonitor;
+        if (!monitor.pending.length || typeof window.reportStorageEvents !== 'function') {
+            return;
+        }
+        const batch = monitor.pending;
+        monitor.pending = [];
+        try {
+            return window.reportStorageEvents({ url: window.location.href, visit: window.__monitorVisit, events: batch });
+        } catch (e) {}
+    }
+    
+    function queueMutation(type, method, key, value) {
+        const monitor = window._storageMonitor;
+        monitor.pending.push([
+            Date.now(),
+            type,
+            method,
+            key === undefined ? null : String(key),
+            value === undefined ? null : String(value).slice(0, MAX_VALUE_LENGTH)
+        ]);
+        if (monitor.pending.length >= MAX_BATCH) {
+            flushMutations();
+        }
+    }
+    
+    if (config.push) {
+        window._storageMonitor.flush = flushMutations;
+        setInterval(flushMutations, FLUSH_INTERVAL_MS);
+        window.addEventListener('pagehide', flushMutations);
     }
     
     // Instrument localStorage
@@ -1,33 +1,91 @@
 import json
 from datetime import datetime
-from pathlib import Path
+from crawler.monitors.init_scripts import InitScriptRegistry, render_bundle
+
+# Reads the storage API counters installed by storage_monitor.js (with _count suffixes)
+API_COUNT_JS = """() => {
+    const monitor = window._storageMonitor;
+    if (!monitor) {
+        return null;
+    }
+    const counts = (name) => ({
+        getItem_count: monitor[name].getItem,
+        setItem_count: monitor[name].setItem,
+        removeItem_count: monitor[name].removeItem,
+        clear_count: monitor[name].clear
+    });
+    return { localStorage: counts('localStorage'), sessionStorage: counts('sessionStorage') };
+}"""
+
+# Reads all items of both storages and the API counters in one call
+SNAPSHOT_JS = """() => {
+    const readStorage = (storage) => {
+        const items = [];
+        for (let i = 0; i < storage.length; i++) {
+            const key = storage.key(i);
+            items.push({
+                key: key,
+                value: storage.getItem(key)
+            });
+        }
+        return items;
+    };
+    if (window._storageMonitor) {
+        window._storageMonitor.flush();
+    }
+    return {
+        local_storage: readStorage(localStorage),
+        session_storage: readStorage(sessionStorage),
+        api_count: (""" + API_COUNT_JS + """)()
+    };
+}"""
 
 class StorageMonitor:
     """Simple monitor for web storage usage"""
     
-    def __init__(self, verbose=False):
-        """Initialize storage monitor"""
+    def __init__(self, verbose=False, push_mode=False):
+        """
+        Initialize storage monitor
+        
+        In push mode storage_monitor.js batches setItem/removeItem/clear calls and
+        sends them through one exposed binding, building a full mutation log per visit.
+        """
         self.storage_items = {}  # Storage data by visit
         self.api_count = {}  # API count by visit
+        self.mutation_log = {}  # Pushed storage mutations by visit
         self.verbose = verbose
+        self.push_mode = push_mode
+        self.current_visit = 0
         self.setup_complete = False
         
-        # Get path to the JavaScript file
-        script_path = Path(__file__).parent / "storage_monitor.js"
-        with open(script_path, 'r') as f:
-            self.monitor_js = f.read()
+        # Standalone monitor script for pages that were loaded before the init script was added
+        self.monitor_js = render_bundle({'storage': {'push': False}})
+        
+        # Snapshot that also (re)installs the monitor, run with a single evaluate
+        self.snapshot_js = "() => {\n" + self.monitor_js + "\nreturn (" + SNAPSHOT_JS + ")();\n}"
         
         if self.verbose:
             print(f"[StorageMonitor] Initialized with verbose={verbose}")
     
-    async def setup_monitoring(self, page):
-        """Set up storage monitoring on the page"""
+    async def setup_monitoring(self, page, visit_number=0, scripts=None):
+        """
+        Set up storage monitoring on the page
+        
+        With a shared InitScriptRegistry the script is only registered and the caller
+        installs the bundle; otherwise it is installed on the page's context directly.
+        """
+        self.current_visit = visit_number
         try:
             if self.verbose:
                 print("[StorageMonitor] Setting up monitoring...")
             
             # Add the script as init script to ensure it runs on every navigation
-            await page.add_init_script(self.monitor_js)
+            registry = scripts or InitScriptRegistry()
+            registry.add_script('storage', {'push': self.push_mode})
+            if self.push_mode:
+                registry.add_binding('reportStorageEvents', self._handle_storage_events)
+            if scripts is None:
+                await registry.install(page.context, visit_number)
             
             # Also inject it immediately if we're on a page already
             if page.url != "about:blank":
@@ -48,67 +106,19 @@ class StorageMonitor:
             
             # Ensure monitoring is set up
             if not self.setup_complete:
-                await self.setup_monitoring(page)
-            
-            # Force install the monitor directly on the page
-            await page.evaluate(self.monitor_js)
+                await self.setup_monitoring(page, visit_number)
             
-            # Get localStorage
-            local_storage = await page.evaluate("""() => {
-                const items = [];
-                for (let i = 0; i < localStorage.length; i++) {
-                    const key = localStorage.key(i);
-                    items.push({
-                        key: key,
-                        value: localStorage.getItem(key)
-                    });
-                }
-                return items;
-            }""")
-            
-            # Get sessionStorage
-            session_storage = await page.evaluate("""() => {
-                const items = [];
-                for (let i = 0; i < sessionStorage.length; i++) {
-                    const key = sessionStorage.key(i);
-                    items.push({
-                        key: key,
-                        value: sessionStorage.getItem(key)
-                    });
-                }
-                return items;
-            }""")
-            
-            # Get API usage counters
-            api_count = await page.evaluate("""() => {
-                // Return the API usage counts
-                if (window._storageMonitor) {
-                    return {
-                        localStorage: {
-                            getItem_count: window._storageMonitor.localStorage.getItem,
-                            setItem_count: window._storageMonitor.localStorage.setItem,
-                            removeItem_count: window._storageMonitor.localStorage.removeItem,
-                            clear_count: window._storageMonitor.localStorage.clear
-                        },
-                        sessionStorage: {
-                            getItem_count: window._storageMonitor.sessionStorage.getItem,
-                            setItem_count: window._storageMonitor.sessionStorage.setItem,
-                            removeItem_count: window._storageMonitor.sessionStorage.removeItem,
-                            clear_count: window._storageMonitor.sessionStorage.clear
-                        }
-                    };
-                }
-                return null;
-            }""")
+            # One round-trip installs the monitor if needed and reads both storages and the API counters
+            snapshot = await page.evaluate(self.snapshot_js)
             
             # Store API count for this visit
-            if api_count:
-                self.api_count[visit_number] = api_count
+            if snapshot['api_count']:
+                self.api_count[visit_number] = snapshot['api_count']
             
             # Store snapshot
             self.storage_items[visit_number] = {
-                'local_storage': local_storage,
-                'session_storage': session_storage,
+                'local_storage': snapshot['local_storage'],
+                'session_storage': snapshot['session_storage'],
                 'url': page.url
             }
             
@@ -124,26 +134,7 @@ class StorageMonitor:
             if self.verbose:
                 print(f"[StorageMonitor] Collecting API metrics for visit {visit_number}")
             
-            metrics = await page.evaluate("""() => {
-                // Return the API usage counts with _count suffix
-                if (window._storageMonitor) {
-                    return {
-                        localStorage: {
-                            getItem_count: window._storageMonitor.localStorage.getItem,
-                            setItem_count: window._storageMonitor.localStorage.setItem,
-                            removeItem_count: window._storageMonitor.localStorage.removeItem,
-                            clear_count: window._storageMonitor.localStorage.clear
-                        },
-                        sessionStorage: {
-                            getItem_count: window._storageMonitor.sessionStorage.getItem,
-                            setItem_count: window._storageMonitor.sessionStorage.setItem,
-                            removeItem_count: window._storageMonitor.sessionStorage.removeItem,
-                            clear_count: window._storageMonitor.sessionStorage.clear
-                        }
-                    };
-                }
-                return null;
-            }""")
+            metrics = await page.evaluate(API_COUNT_JS)
             
             if metrics:
                 self.api_count[visit_number] = metrics
@@ -154,6 +145,32 @@ class StorageMonitor:
                 print(f"[StorageMonitor] Error collecting API metrics: {e}")
             return None
     
+    async def flush_reports(self, page):
+        """Send the mutations still queued in the page's frames (push mode), call before reading the visit's data"""
+        if not self.push_mode:
+            return
+        for frame in page.frames:
+            try:
+                await frame.evaluate("() => window._storageMonitor && window._storageMonitor.flush()")
+            except Exception as e:
+                if self.verbose:
+                    print(f"[StorageMonitor] Could not flush storage events in {frame.url}: {e}")
+    
+    async def _handle_storage_events(self, batch):
+        """Receive a batch of storage mutations pushed by storage_monitor.js"""
+        # The page stamps batches with its visit (see InitScriptRegistry.install)
+        log = self.mutation_log.setdefault(batch.get('visit', self.current_visit), [])
+        url = batch.get('url')
+        for timestamp, storage_type, method, key, value in batch.get('events', []):
+            log.append({
+                'timestamp': timestamp,
+                'type': storage_type,
+                'method': method,
+                'key': key,
+                'value': value,
+                'url': url
+            })
+    
     def get_results(self):
         """Get results of storage monitoring"""
         # Merge storage and API count data
@@ -171,5 +188,9 @@ class StorageMonitor:
             # Add API count data if available
             if visit_number in self.api_count:
                 results[visit_number]['api_count'] = self.api_count[visit_number]
+            
+            # Add the pushed mutation log if available
+            if visit_number in self.mutation_log:
+                results[visit_number]['mutation_log'] = self.mutation_log[visit_number]
         
         return results
\ No newline at end of file
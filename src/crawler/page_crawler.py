@@ -3,17 +3,20 @@ from crawler.monitors.network_monitor import NetworkMonitor
 from crawler.monitors.fingerprint_collector import FingerprintCollector
 from crawler.monitors.storage_monitor import StorageMonitor
 from crawler.monitors.banner_monitor import BannerMonitor
+from crawler.monitors.body_capture import BodyCapturePolicy
+from crawler.monitors.init_scripts import InitScriptRegistry
+from crawler.page_readiness import PageReadiness
 from datetime import datetime
 from tqdm import tqdm
 import asyncio
-import random
+import time
 from utils.page_collector import load_site_pages
 from utils.user_simulator import UserSimulator
 from playwright_stealth import Stealth
 
 
 class WebsiteCrawler:
-    def __init__(self, subpages_nr=20, visits=2, verbose=False, monitors=None, extension_name=None, headless=False, viewport=None, domain=None, channel=None, window_position=None, window_size=None, demo=False, slow_mo=0):
+    def __init__(self, subpages_nr=20, visits=2, verbose=False, monitors=None, extension_name=None, headless=False, viewport=None, domain=None, channel=None, window_position=None, window_size=None, demo=False, slow_mo=0, network_capture='route', body_capture=None, storage_push=False):
         """Initialize the crawler with configuration parameters"""
         self.subpages_nr = subpages_nr
         self.visits = visits
@@ -36,12 +39,16 @@ class WebsiteCrawler:
             self.monitors = None
         else:
             self.monitors = monitors or {
-                'network': NetworkMonitor(verbose=verbose),
-                'storage': StorageMonitor(verbose=verbose),
+                'network': NetworkMonitor(verbose=verbose, capture_mode=network_capture,
+                                          body_policy=BodyCapturePolicy(**body_capture) if body_capture else None),
+                'storage': StorageMonitor(verbose=verbose, push_mode=storage_push),
                 'fingerprint': FingerprintCollector(verbose=verbose),
                 'banner': BannerMonitor(verbose=verbose)
             }
 
+        # Learns per site/profile how long pages take to settle
+        self.readiness = PageReadiness(network_monitor=self.monitors['network'] if self.monitors else None)
+
     def _log(self, message):
         """Log message if verbose mode is enabled"""
         if self.verbose:
@@ -163,6 +170,11 @@ class WebsiteCrawler:
             elif self.demo:
                 self._log("Demo mode: Keeping Playwright instance open (shared between crawlers)")
 
+        # Make sure the banner captures are on disk before the site counts as done
+        if self.monitors:
+            await self.monitors['banner'].flush_writes()
+            self.monitors['banner'].close()
+
         if visit_results:
             # Construct final data if there were successful visits
             return await self._construct_final_data(domain, visit_results)
@@ -196,8 +208,19 @@ class WebsiteCrawler:
         
         # Continue with your existing monitoring setup
         await self.monitors['network'].setup_monitoring(page, visit)
-        await self.monitors['fingerprint'].setup_monitoring(page, visit)
-        await self.monitors['storage'].setup_monitoring(page)
+        
+        # Fingerprint and storage scripts are injected as one bundle
+        scripts = InitScriptRegistry()
+        await self.monitors['fingerprint'].setup_monitoring(page, visit, scripts=scripts)
+        await self.monitors['storage'].setup_monitoring(page, visit, scripts=scripts)
+        await scripts.install(page.context, visit)
+
+    async def _flush_page_reports(self, page):
+        """Flush fingerprint and storage reports still queued in the page"""
+        if self.demo:
+            return
+        await self.monitors['fingerprint'].flush_reports(page)
+        await self.monitors['storage'].flush_reports(page)
 
     async def _capture_and_interact(self, page, url, visit, idx):
         """Captures data (final URL, banner, storage) and simulates interaction."""
@@ -238,32 +261,21 @@ class WebsiteCrawler:
             error_message = None
 
             try:
+                start = time.monotonic()
                 await page.goto(url, timeout=2000)
+                goto_ms = round((time.monotonic() - start) * 1000)
 
-                try:
-                    await page.wait_for_load_state('domcontentloaded', timeout=2000)
-                except Exception as e:
-                    self._log(f"Note: domcontentloaded not reached for {url} - continuing anyway")
-
-                try:
-                    pass
-                    #await page.wait_for_load_state('load', timeout=2000)
-                except Exception as e:
-                    pass
-                    #self._log(f"Note: load not reached for {url} - continuing anyway")
-
-                # Optional: Short wait for network to settle, but with reduced timeout
-                try:
-                    await page.wait_for_load_state('networkidle', timeout=2000)
-                except Exception as e:
-                    # This is expected to fail sometimes, so just log at debug level
-                    self._log(f"Note: networkidle not reached for {url} - continuing anyway")
+                # Wait for DOM and network quiet, bounded by what earlier pages of this site needed
+                timings = await self.readiness.wait_until_ready(page, self.base_domain, self.extension_name, url, visit)
+                timings['goto_ms'] = goto_ms
 
                 #tqdm.write(f"Capturing and interacting with {url}")
+                start = time.monotonic()
                 final_url = await self._capture_and_interact(page, url, visit, idx)
+                timings['interact_ms'] = round((time.monotonic() - start) * 1000)
 
-                # Wait abit after scroll
-                await asyncio.sleep(random.uniform(0.5, 0.7))
+                # Wait abit after scroll, until requests it triggered are done
+                timings['settle_ms'] = await self.readiness.settle(page)
 
             except Exception as e:
                 error_message = str(e)
@@ -326,7 +338,9 @@ class WebsiteCrawler:
             'statistics': self.monitors['network'].get_statistics(),
             'storage': self.monitors['storage'].get_results(),
             'fingerprinting': self.monitors['fingerprint'].get_fingerprinting_data(),
-            'cookies': self.monitors['network'].get_cookies()
+            'cookies': self.monitors['network'].get_cookies(),
+            'page_readiness': self.readiness.get_summary(),
+            'banner_readiness': self.monitors['banner'].get_readiness(self.base_domain)
         }
 
         return final_data
@@ -347,6 +361,9 @@ class WebsiteCrawler:
             # Visit subpages
             visited_in_this_cycle = await self._visit_urls(page, urls, visit)
             
+            # Reports are batched in the page, send what is left before reading the results
+            await self._flush_page_reports(page)
+
             # Collect results for this visit before teardown
             visit_data = await self._collect_visit_results(visit, visited_in_this_cycle)
             visit_results.append(visit_data)
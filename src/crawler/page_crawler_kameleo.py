@@ -3,6 +3,8 @@ from crawler.monitors.network_monitor import NetworkMonitor
 from crawler.monitors.fingerprint_collector import FingerprintCollector
 from crawler.monitors.storage_monitor import StorageMonitor
 from crawler.monitors.banner_monitor import BannerMonitor
+from crawler.monitors.body_capture import BodyCapturePolicy
+from crawler.monitors.init_scripts import InitScriptRegistry
 from datetime import datetime
 from tqdm import tqdm
 import random
@@ -17,7 +19,7 @@ import time
 
 
 class WebsiteCrawler:
-    def __init__(self, domain, profile_name, profile_id, subpages_nr=20, visits=2, verbose=False, monitors=None, extension_name=None, headless=False, viewport=None, kameleo_client=None):
+    def __init__(self, domain, profile_name, profile_id, subpages_nr=20, visits=2, verbose=False, monitors=None, extension_name=None, headless=False, viewport=None, kameleo_client=None, network_capture='route', body_capture=None, storage_push=False):
         """
         Initialize website crawler with specified parameters
         
@@ -33,6 +35,9 @@ class WebsiteCrawler:
             headless: Whether to run the browser in headless mode
             viewport: Viewport size for the browser
             kameleo_client: Existing KameleoLocalApiClient instance (optional)
+            network_capture: NetworkMonitor capture mode ('route' or 'events')
+            body_capture: Response body capture policy options (see BodyCapturePolicy)
+            storage_push: Push storage mutations from the page (see StorageMonitor)
         """
         self.domain = domain
         self.profile_name = profile_name
@@ -49,8 +54,9 @@ class WebsiteCrawler:
 
         # Use provided monitors or create defaults
         self.monitors = monitors or {
-            'network': NetworkMonitor(verbose=verbose),
-            'storage': StorageMonitor(verbose=verbose),
+            'network': NetworkMonitor(verbose=verbose, capture_mode=network_capture,
+                                      body_policy=BodyCapturePolicy(**body_capture) if body_capture else None),
+            'storage': StorageMonitor(verbose=verbose, push_mode=storage_push),
             'fingerprint': FingerprintCollector(verbose=verbose),
             'banner': BannerMonitor(verbose=verbose)
         }
@@ -237,12 +243,19 @@ class WebsiteCrawler:
                 # Visit URLs
                 visited_in_this_cycle = await self._visit_urls(page, urls, visit)
 
+                # Reports are batched in the page, send what is left before reading the results
+                await self._flush_page_reports(page)
+
                 # Collect visit results
                 visit_results.append(await self._collect_visit_results(visit, visited_in_this_cycle))
 
                 # Stop the Kameleo profile after each visit
                 await self._stop_profile(context)
         
+        # Make sure the banner captures are on disk before the site counts as done
+        await self.monitors['banner'].flush_writes()
+        self.monitors['banner'].close()
+
         # Construct and save the final data structure
         return await self._construct_final_data(domain, visit_results)
 
@@ -259,8 +272,17 @@ class WebsiteCrawler:
     async def _setup_monitoring(self, page, visit):
         """Setup network, fingerprint, and storage monitoring"""
         await self.monitors['network'].setup_monitoring(page, visit)
-        await self.monitors['fingerprint'].setup_monitoring(page, visit)
-        await self.monitors['storage'].setup_monitoring(page)
+        
+        # Fingerprint and storage scripts are injected as one bundle
+        scripts = InitScriptRegistry()
+        await self.monitors['fingerprint'].setup_monitoring(page, visit, scripts=scripts)
+        await self.monitors['storage'].setup_monitoring(page, visit, scripts=scripts)
+        await scripts.install(page.context, visit)
+
+    async def _flush_page_reports(self, page):
+        """Flush fingerprint and storage reports still queued in the page"""
+        await self.monitors['fingerprint'].flush_reports(page)
+        await self.monitors['storage'].flush_reports(page)
 
     async def _visit_homepage(self, page, domain):
         """Visit the homepage and handle any errors"""
@@ -365,7 +387,8 @@ class WebsiteCrawler:
             'statistics': self.monitors['network'].get_statistics(),
             'storage': self.monitors['storage'].get_results(),
             'fingerprinting': self.monitors['fingerprint'].get_fingerprinting_data(),
-            'cookies': self.monitors['network'].get_cookies()
+            'cookies': self.monitors['network'].get_cookies(),
+            'banner_readiness': self.monitors['banner'].get_readiness(self.base_domain)
         }
 
         return final_data
\ No newline at end of file
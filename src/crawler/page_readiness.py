@@ -0,0 +1,167 @@
+import time
+import asyncio
+from collections import deque
+
+# Resolves once the DOM has had no mutations for quietMs, or after maxMs
+DOM_QUIET_JS = """([quietMs, maxMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let quietTimer = null;
+    const finish = (reason) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(reason);
+    };
+    const resetQuiet = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish('quiet'), quietMs);
+    };
+    const observer = new MutationObserver(resetQuiet);
+    const capTimer = setTimeout(() => finish('timeout'), maxMs);
+    observer.observe(document.documentElement, { childList: true, subtree: true, attributes: true });
+    resetQuiet();
+})"""
+
+# Requests allowed in flight while the network counts as quiet (long polling, beacons, ...)
+QUIET_MAX_INFLIGHT = 2
+
+# How often the network monitor is polled
+POLL_INTERVAL = 0.05
+
+# Earlier pages needed before the learned budget replaces the default
+MIN_SAMPLES = 3
+
+
+class LoadProfile:
+    """
+    Ready times observed on one site with one profile
+
+    The wait budget for the next page is the 90th percentile of the recent
+    ready times with some headroom, so fast sites stop waiting for the
+    worst case while slow sites keep the full budget.
+    """
+
+    def __init__(self, window=30, headroom=1.25):
+        self.samples = deque(maxlen=window)
+        self.headroom = headroom
+
+    def add(self, ready_ms):
+        self.samples.append(ready_ms)
+
+    def budget_ms(self, default_ms, min_ms, max_ms):
+        """Get the wait budget for the next page"""
+        if len(self.samples) < MIN_SAMPLES:
+            return default_ms
+        ordered = sorted(self.samples)
+        p90 = ordered[int(0.9 * (len(ordered) - 1))]
+        return int(min(max_ms, max(min_ms, p90 * self.headroom)))
+
+
+class PageReadiness:
+    """
+    Decides when a loaded page is ready for capture and interaction.
+
+    A page is ready when the DOM has stopped mutating and the NetworkMonitor has
+    seen no request activity for quiet_ms (both checked concurrently), or when
+    the budget learned from earlier pages of the same site and profile runs out.
+    Every wait is recorded in telemetry with the time each check took.
+
+    Args:
+        network_monitor: NetworkMonitor of the crawl, or None to fall back to
+            Playwright's networkidle state
+        quiet_ms: DOM/network quiet period that counts as ready
+        default_budget_ms: Budget until a site has MIN_SAMPLES ready times
+            (the old domcontentloaded + networkidle timeouts)
+        min_budget_ms, max_budget_ms: Bounds of the learned budget
+    """
+
+    def __init__(self, network_monitor=None, quiet_ms=500, default_budget_ms=4000,
+                 min_budget_ms=1000, max_budget_ms=4000):
+        self.network_monitor = network_monitor
+        self.quiet_ms = quiet_ms
+        self.default_budget_ms = default_budget_ms
+        self.min_budget_ms = min_budget_ms
+        self.max_budget_ms = max_budget_ms
+        self.profiles = {}
+        self.telemetry = []
+
+    def profile(self, site, extension_name):
+        """Get the load profile of a site/profile pair"""
+        key = (site, extension_name)
+        if key not in self.profiles:
+            self.profiles[key] = LoadProfile()
+        return self.profiles[key]
+
+    async def _wait_dom_quiet(self, page, budget_ms):
+        try:
+            return await page.evaluate(DOM_QUIET_JS, [self.quiet_ms, budget_ms])
+        except Exception:
+            # E.g. the page navigated again while waiting
+            return 'error'
+
+    async def _wait_network_quiet(self, page, budget_ms, quiet_ms, deadline):
+        if self.network_monitor is None:
+            try:
+                await page.wait_for_load_state('networkidle', timeout=budget_ms)
+                return 'quiet'
+            except Exception:
+                return 'timeout'
+
+        quiet = quiet_ms / 1000
+        while time.monotonic() < deadline:
+            if self.network_monitor.quiet_for(QUIET_MAX_INFLIGHT) >= quiet:
+                return 'quiet'
+            await asyncio.sleep(POLL_INTERVAL)
+        return 'timeout'
+
+    async def wait_until_ready(self, page, site, extension_name, url, visit):
+        """
+        Wait until the page is ready
+
+        Returns:
+            dict: Telemetry entry of this page, phases can be added by the caller
+        """
+        profile = self.profile(site, extension_name)
+        budget_ms = profile.budget_ms(self.default_budget_ms, self.min_budget_ms, self.max_budget_ms)
+        start = time.monotonic()
+        timings = {}
+
+        async def timed(name, wait):
+            result = await wait
+            timings[name] = round((time.monotonic() - start) * 1000)
+            return result
+
+        dom_reason, network_reason = await asyncio.gather(
+            timed('dom_ms', self._wait_dom_quiet(page, budget_ms)),
+            timed('network_ms', self._wait_network_quiet(page, budget_ms, self.quiet_ms, start + budget_ms / 1000))
+        )
+        ready_ms = round((time.monotonic() - start) * 1000)
+        profile.add(ready_ms)
+
+        entry = {
+            'url': url,
+            'visit': visit,
+            'budget_ms': budget_ms,
+            'ready_ms': ready_ms,
+            'dom': dom_reason,
+            'network': network_reason,
+            **timings
+        }
+        self.telemetry.append(entry)
+        return entry
+
+    async def settle(self, page, max_ms=700, quiet_ms=200):
+        """Wait briefly for requests triggered by interaction, returns the time waited in ms"""
+        start = time.monotonic()
+        await self._wait_network_quiet(page, max_ms, quiet_ms, start + max_ms / 1000)
+        return round((time.monotonic() - start) * 1000)
+
+    def get_summary(self):
+        """Telemetry of all pages plus the learned budgets"""
+        return {
+            'pages': self.telemetry,
+            'budgets_ms': {
+                f"{site}|{extension}": profile.budget_ms(self.default_budget_ms, self.min_budget_ms, self.max_budget_ms)
+                for (site, extension), profile in self.profiles.items()
+            }
+        }
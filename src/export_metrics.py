@@ -0,0 +1,604 @@
+import os
+import csv
+import json
+from collections import Counter, namedtuple
+
+# Visit whose data is exported
+VISIT_ID = '1'
+
+# Domain categories with their own *_domains/*_requests columns (column prefix -> category)
+DOMAIN_CATEGORIES = [
+    ('advertising', 'Advertising'),
+    ('analytics', 'Site Analytics'),
+    ('social_media', 'Social Media'),
+    ('essential', 'Essential'),
+    ('hosting', 'Hosting'),
+    ('customer_interaction', 'Customer Interaction'),
+    ('audio_video', 'Audio/Video Player'),
+    ('extensions', 'Extensions'),
+    ('adult_advertising', 'Adult Advertising'),
+    ('consent_management', 'Consent Management'),
+    ('miscellaneous', 'Misc'),
+    ('utilities', 'Utilities'),
+]
+KNOWN_DOMAIN_CATEGORIES = {category for _, category in DOMAIN_CATEGORIES}
+
+# Marks a request without the field in the requests table
+_MISSING = object()
+
+Metric = namedtuple('Metric', ['name', 'sections', 'compute', 'dtype'])
+
+# Column value types (all nullable), used for typed outputs such as Parquet
+DTYPES = ('int', 'float', 'str', 'bool')
+
+# Registered metrics, in CSV column order
+METRICS = {}
+
+
+def register_metric(name, compute, sections=(), dtype='int'):
+    """
+    Register a CSV column
+
+    Args:
+        name: Column name
+        compute: Function taking a CrawlDocument and returning the column value
+        sections: Top-level crawl document sections the metric reads
+        dtype: Value type, one of DTYPES (values may also be None)
+    """
+    if name in METRICS:
+        raise ValueError(f"Metric '{name}' is already registered")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}' for metric '{name}', expected one of {DTYPES}")
+    METRICS[name] = Metric(name, frozenset(sections), compute, dtype)
+
+
+def metric(name, sections=(), dtype='int'):
+    """Decorator form of register_metric"""
+    def decorator(func):
+        register_metric(name, func, sections, dtype)
+        return func
+    return decorator
+
+
+def register_summary_metrics(summary, columns, sections, dtype='int'):
+    """
+    Register columns that are read from a shared per-document summary
+
+    Args:
+        summary: Function computing a dict from a CrawlDocument (computed once per document)
+        columns: Column names, or (column name, summary key) tuples
+        sections: Sections the summary reads
+        dtype: Value type of all the columns
+    """
+    for column in columns:
+        name, key = column if isinstance(column, tuple) else (column, column)
+        register_metric(name, lambda doc, key=key: doc.derived(summary)[key], sections, dtype)
+
+
+def resolve_columns(columns=None):
+    """
+    Get the columns to compute, in registry order
+
+    Raises:
+        ValueError: If a requested column is not registered
+    """
+    if columns is None:
+        return list(METRICS)
+    unknown = [name for name in columns if name not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return [name for name in METRICS if name in set(columns)]
+
+
+def column_types(columns=None):
+    """Get {column: dtype} for the given columns (all by default)"""
+    return {name: METRICS[name].dtype for name in resolve_columns(columns)}
+
+
+def required_sections(columns=None):
+    """Get the crawl document sections needed to compute the given columns"""
+    sections = set()
+    for name in resolve_columns(columns):
+        sections |= METRICS[name].sections
+    return sections
+
+
+class CrawlDocument:
+    """
+    The sections of one crawl file that are needed for export.
+
+    Aggregates shared by several metrics are computed once per document via derived().
+    """
+
+    def __init__(self, json_file, data, banner_analysis=None):
+        self.json_file = json_file
+        self.data = data
+        # Results from the banner sidecar store take precedence over the file's own field
+        self.banner_analysis = banner_analysis if banner_analysis is not None else data.get('banner_analysis', {})
+        # Domain categories seen in this document, for the category report in json_to_csv
+        self.categories_seen = set()
+        self.unmatched_categories = set()
+        self._derived = {}
+
+    def get(self, section, default=None):
+        """Get a top-level section"""
+        return self.data.get(section, default)
+
+    def visit(self, section, visit_id=VISIT_ID):
+        """Get one visit's data from a per-visit section, or None"""
+        return self.data.get(section, {}).get(visit_id)
+
+    def derived(self, func):
+        """Compute func(self) once and reuse the result"""
+        if func not in self._derived:
+            self._derived[func] = func(self)
+        return self._derived[func]
+
+
+def load_crawl_document(json_file, banner_analysis=None, sections=None):
+    """
+    Load a crawl file, keeping only the given sections (all when None)
+
+    Dropping unused sections right after parsing releases large ones such as
+    the raw network data before the metrics run.
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if sections is not None:
+        data = {key: data[key] for key in sections if key in data}
+    return CrawlDocument(json_file, data, banner_analysis)
+
+
+def compute_row(doc, columns=None):
+    """Compute the requested columns (all by default) for one crawl document"""
+    return {name: METRICS[name].compute(doc) for name in resolve_columns(columns)}
+
+
+def load_site_rankings(csv_path='data/db+ref/Tranco_final_sample.csv'):
+    """Load site rankings from CSV file"""
+    rankings = {}
+    try:
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Store lowercase domain as key for case-insensitive matching
+                rankings[row['domain'].lower()] = int(row['rank'])
+        return rankings
+    except Exception as e:
+        print(f"Warning: Could not load site rankings from {csv_path}: {e}")
+        return {}
+
+
+# Site rankings, loaded on first use
+_site_rankings = None
+
+
+def get_site_rankings():
+    """Get the site rankings shared by all documents in this process"""
+    global _site_rankings
+    if _site_rankings is None:
+        _site_rankings = load_site_rankings()
+    return _site_rankings
+
+
+# Basic site info
+
+@metric('profile', dtype='str')
+def _profile(doc):
+    path_parts = os.path.normpath(doc.json_file).split(os.sep)
+    return path_parts[-2] if len(path_parts) > 2 else "unknown"
+
+
+@metric('domain', sections=('domain',), dtype='str')
+def _domain(doc):
+    # Fall back to the file name when the crawl did not record the domain
+    return doc.get('domain', '') or os.path.basename(doc.json_file)[:-5]
+
+
+@metric('rank', sections=('domain',))
+def _rank(doc):
+    domain = _domain(doc).lower()
+    if not domain:
+        return None
+    rankings = get_site_rankings()
+    rank = rankings.get(domain)
+    if rank is None:
+        # Try without/with the www prefix
+        rank = rankings.get(domain[4:]) if domain.startswith('www.') else rankings.get(f"www.{domain}")
+    return rank
+
+
+@metric('primary_category', sections=('categories',), dtype='str')
+def _primary_category(doc):
+    categories = doc.get('categories', [])
+    return categories[0] if categories else ""
+
+
+@metric('additional_categories', sections=('categories',), dtype='str')
+def _additional_categories(doc):
+    categories = doc.get('categories', [])
+    return "|".join(categories[1:]) if len(categories) > 1 else ""
+
+
+@metric('timestamp', sections=('timestamp',), dtype='str')
+def _timestamp(doc):
+    return doc.get('timestamp', '')
+
+
+# Page/banner status
+
+def _banner_status(doc):
+    """Page load and banner removal status for the exported visit"""
+    status = {'page_loaded': None, 'banner_removed': None, 'page_status': None, 'banner_conclusion': None}
+    banner_analysis = doc.banner_analysis
+
+    if banner_analysis:
+        visit_data = banner_analysis.get(f"visit{VISIT_ID}")
+        if visit_data is not None:
+            if 'page_loaded' in visit_data:
+                status['page_loaded'] = visit_data['page_loaded']
+            status['page_status'] = visit_data.get('page_status', None)
+            status['banner_conclusion'] = visit_data.get('conclusion', None)
+
+        summary_status = banner_analysis.get('summary_status')
+        if summary_status in ('removed', 'likely_removed'):
+            status['banner_removed'] = True
+        elif summary_status == 'not_removed':
+            status['banner_removed'] = False
+
+    # Fall back to the crawl's own page_loaded field
+    if status['page_loaded'] is None and 'page_loaded' in doc.data:
+        page_loaded_info = doc.data['page_loaded']
+        if isinstance(page_loaded_info, dict):
+            if 'loaded' in page_loaded_info:
+                status['page_loaded'] = page_loaded_info['loaded']
+        elif page_loaded_info is not None:
+            status['page_loaded'] = bool(page_loaded_info)
+
+    return status
+
+
+register_summary_metrics(_banner_status, ['page_loaded', 'banner_removed'],
+                         sections=('banner_analysis', 'page_loaded'), dtype='bool')
+register_summary_metrics(_banner_status, ['page_status', 'banner_conclusion'],
+                         sections=('banner_analysis', 'page_loaded'), dtype='str')
+
+
+# Requests and domains
+
+def _domain_summary(doc):
+    """Per-domain request counts from domain_analysis, in one pass over the domains"""
+    summary = {
+        'has_domains': False,
+        'request_total': 0,
+        'domain_count': 0,
+        'first_party_requests': 0,
+        'third_party_requests': 0,
+        'filter_match_requests': 0,
+        'cname_cloaking_domains': 0,
+        'third_party_domains': set(),
+        'category_requests': Counter(),
+        'category_domains': Counter(),
+        'uncategorized_domains': 0
+    }
+
+    domain_analysis = doc.get('domain_analysis', {})
+    if not (domain_analysis and 'domains' in domain_analysis):
+        return summary
+
+    domains = domain_analysis.get('domains', [])
+    summary['has_domains'] = True
+    summary['domain_count'] = len(domains)
+
+    for d in domains:
+        req_count = d.get('request_count', 0)
+        categories = d.get('categories', [])
+        summary['request_total'] += req_count
+
+        if d.get('filter_match', False):
+            summary['filter_match_requests'] += req_count
+        if d.get('cname_cloaking', False):
+            summary['cname_cloaking_domains'] += 1
+
+        if d.get('is_first_party_domain', False):
+            summary['first_party_requests'] += req_count
+        else:
+            summary['third_party_requests'] += req_count
+            summary['third_party_domains'].add(d.get('domain', ''))
+
+        if not categories:
+            summary['uncategorized_domains'] += 1
+        for category in categories:
+            summary['category_requests'][category] += req_count
+            doc.categories_seen.add(category)
+            if category in KNOWN_DOMAIN_CATEGORIES:
+                summary['category_domains'][category] += 1
+            else:
+                doc.unmatched_categories.add(category)
+                summary['uncategorized_domains'] += 1
+
+    return summary
+
+
+def _requests_table(doc):
+    """Columnar view of the exported visit's raw requests"""
+    network_data = doc.visit('network_data') or {}
+    requests = network_data.get('requests', [])
+    return {
+        'count': len(requests),
+        'domain': [req.get('domain', _MISSING) for req in requests],
+        'resource_type': [req.get('resource_type', _MISSING) for req in requests]
+    }
+
+
+def _request_totals(doc):
+    """
+    Request and domain totals
+
+    Prefers domain_analysis, then the crawl statistics, and only falls back to
+    the raw requests when neither is available.
+    """
+    totals = {
+        'total_requests': 0,
+        'unique_domains': 0,
+        'filter_matches': 0,
+        'potential_cname_cloaking': 0,
+        'js_requests': 0,
+        'css_requests': 0,
+        'image_requests': 0
+    }
+    domain_analysis = doc.get('domain_analysis', {})
+    statistics = doc.get('statistics', {})
+
+    summary = doc.derived(_domain_summary)
+    if summary['has_domains']:
+        if summary['request_total'] > 0:
+            totals['total_requests'] = summary['request_total']
+        totals['unique_domains'] = summary['domain_count']
+        if summary['cname_cloaking_domains'] > 0:
+            totals['potential_cname_cloaking'] = summary['cname_cloaking_domains']
+
+        domain_statistics = domain_analysis.get('statistics', {})
+        if domain_statistics:
+            totals['filter_matches'] = domain_statistics.get('filter_matches', 0)
+            if 'total_domains' in domain_statistics:
+                totals['unique_domains'] = domain_statistics.get('total_domains')
+
+    # Pre-calculated statistics, kept for backward compatibility
+    request_types = {}
+    if statistics:
+        if totals['filter_matches'] == 0:
+            totals['filter_matches'] = statistics.get('filter_matches', 0)
+        if 'total_domains' in statistics:
+            totals['unique_domains'] = statistics.get('total_domains')
+
+        request_types = statistics.get('request_types', {})
+        if request_types:
+            totals['js_requests'] = request_types.get('script', 0)
+            totals['css_requests'] = request_types.get('stylesheet', 0)
+            totals['image_requests'] = request_types.get('image', 0)
+            if not totals['total_requests'] and 'total_requests' in statistics:
+                totals['total_requests'] = statistics.get('total_requests', 0)
+
+        cname_data = statistics.get('cname_cloaking', {})
+        if cname_data:
+            totals['potential_cname_cloaking'] = cname_data.get('total', 0)
+
+    if not domain_analysis and not request_types and doc.visit('network_data'):
+        table = doc.derived(_requests_table)
+        totals['total_requests'] = table['count']
+        totals['unique_domains'] = len(set(table['domain']) - {_MISSING})
+        resource_types = Counter(table['resource_type'])
+        totals['js_requests'] = resource_types['script']
+        totals['css_requests'] = resource_types['stylesheet']
+        totals['image_requests'] = resource_types['image']
+
+    return totals
+
+
+_REQUEST_SECTIONS = ('domain_analysis', 'statistics', 'network_data')
+
+register_summary_metrics(_request_totals, ['total_requests', 'unique_domains'], _REQUEST_SECTIONS)
+register_summary_metrics(_domain_summary, ['first_party_requests', 'third_party_requests'], ('domain_analysis',))
+register_summary_metrics(_request_totals, ['filter_matches'], _REQUEST_SECTIONS)
+register_summary_metrics(_domain_summary, ['filter_match_requests'], ('domain_analysis',))
+register_summary_metrics(_request_totals, ['potential_cname_cloaking'], _REQUEST_SECTIONS)
+
+# Number of domains per category (Utilities has no domains column)
+for _prefix, _category in DOMAIN_CATEGORIES:
+    if _category != 'Utilities':
+        register_metric(f'{_prefix}_domains',
+                        lambda doc, category=_category: doc.derived(_domain_summary)['category_domains'][category],
+                        ('domain_analysis',))
+register_summary_metrics(_domain_summary, ['uncategorized_domains'], ('domain_analysis',))
+
+# Number of requests per category
+for _prefix, _category in DOMAIN_CATEGORIES + [('uncategorized', 'Uncategorized')]:
+    register_metric(f'{_prefix}_requests',
+                    lambda doc, category=_category: doc.derived(_domain_summary)['category_requests'][category],
+                    ('domain_analysis',))
+
+# Resource types
+register_summary_metrics(_request_totals, ['js_requests', 'css_requests', 'image_requests'], _REQUEST_SECTIONS)
+
+
+# Cookies
+
+def _cookie_summary(doc):
+    """Cookie counts from cookie_analysis, or counted from the raw cookies when missing"""
+    summary = {
+        'unique_cookies': 0,
+        'overlapping_cookies': 0,
+        'identified_cookies': 0,
+        'first_party_cookies': 0,
+        'third_party_cookies': 0,
+        'secure_cookies': 0,
+        'httponly_cookies': 0,
+        'necessary_cookies': 0,
+        'functional_cookies': 0,
+        'advertising_cookies': 0,
+        'analytics_cookies': 0,
+        'performance_cookies': 0,
+        'other_cookies': 0,
+        'unknown_cookies': 0,
+        'potential_tracking_cookies_count': 0,
+        'shared_identifiers_count': 0
+    }
+    cookies_data = doc.visit('cookies')
+    cookie_analysis = doc.get('cookie_analysis', {})
+
+    if cookie_analysis:
+        for key in ('unique_cookies', 'overlapping_cookies', 'identified_cookies',
+                    'first_party_cookies', 'third_party_cookies'):
+            summary[key] = cookie_analysis.get(key, 0)
+
+        potential_tracking = cookie_analysis.get('potential_tracking_cookies', {})
+        if potential_tracking:
+            summary['potential_tracking_cookies_count'] = potential_tracking.get('total', 0)
+
+        categories = cookie_analysis.get('categories', {})
+        summary['necessary_cookies'] = categories.get('Necessary', 0)
+        summary['functional_cookies'] = categories.get('Functional', 0)
+        summary['advertising_cookies'] = categories.get('Advertisement', 0)
+        summary['analytics_cookies'] = categories.get('Analytics', 0)
+        summary['performance_cookies'] = categories.get('Performance', 0)
+        summary['other_cookies'] = categories.get('Other', 0)
+        # Combine Unknown, Unclassified, and Not specified into unknown_cookies
+        summary['unknown_cookies'] = (categories.get('Unknown', 0) +
+                                      categories.get('Unclassified', 0) +
+                                      categories.get('Not specified', 0))
+
+        cookie_sharing = cookie_analysis.get('cookie_sharing', {})
+        if cookie_sharing:
+            summary['shared_identifiers_count'] = cookie_sharing.get('shared_identifiers', {}).get('count', 0)
+
+    elif cookies_data:
+        for cookie in cookies_data:
+            # The original export counted secure/httpOnly here and again below;
+            # kept so rows stay comparable with earlier exports
+            if cookie.get('secure', False):
+                summary['secure_cookies'] += 1
+            if cookie.get('httpOnly', False):
+                summary['httponly_cookies'] += 1
+
+            category = cookie.get('category', '').lower()
+            if not category:
+                summary['unknown_cookies'] += 1
+                continue
+
+            summary['identified_cookies'] += 1
+            if 'necessary' in category:
+                summary['necessary_cookies'] += 1
+            elif 'functional' in category:
+                summary['functional_cookies'] += 1
+            elif 'advertisement' in category:
+                summary['advertising_cookies'] += 1
+            elif 'analytics' in category:
+                summary['analytics_cookies'] += 1
+            elif 'performance' in category:
+                summary['performance_cookies'] += 1
+            elif 'other' in category:
+                summary['other_cookies'] += 1
+            elif 'unknown' in category or 'unclassified' in category or 'not specified' in category:
+                summary['unknown_cookies'] += 1
+            else:
+                # If category exists but doesn't match known types, count as Other
+                summary['other_cookies'] += 1
+
+    # Always count secure and httpOnly regardless of where cookie data comes from
+    for cookie in cookies_data or []:
+        if cookie.get('secure', False):
+            summary['secure_cookies'] += 1
+        if cookie.get('httpOnly', False):
+            summary['httponly_cookies'] += 1
+
+    return summary
+
+
+register_summary_metrics(_cookie_summary, [
+    'unique_cookies', 'overlapping_cookies', 'identified_cookies', 'first_party_cookies', 'third_party_cookies',
+    'secure_cookies', 'httponly_cookies', 'necessary_cookies', 'functional_cookies', 'advertising_cookies',
+    'analytics_cookies', 'performance_cookies', 'other_cookies', 'unknown_cookies',
+    'potential_tracking_cookies_count', 'shared_identifiers_count'
+], sections=('cookie_analysis', 'cookies'))
+
+
+# Storage
+
+def _storage_summary(doc):
+    """Storage item counts, getItem usage and potential identifiers"""
+    summary = {
+        'local_storage_count': 0,
+        'session_storage_count': 0,
+        'local_storage_get': 0,
+        'session_storage_get': 0,
+        'storage_potential_identifiers_count': 0,
+        'local_storage_potential_identifiers': 0,
+        'session_storage_potential_identifiers': 0
+    }
+
+    storage_data = doc.visit('storage')
+    if storage_data:
+        summary['local_storage_count'] = storage_data.get('local_storage_count', 0)
+        summary['session_storage_count'] = storage_data.get('session_storage_count', 0)
+
+        # API usage is stored as "api_usage" (old format) or "api_count" (new format)
+        api_usage = storage_data.get('api_usage', {}) or storage_data.get('api_count', {})
+        if api_usage:
+            summary['local_storage_get'] = api_usage.get('localStorage', {}).get('getItem_count', 0)
+            summary['session_storage_get'] = api_usage.get('sessionStorage', {}).get('getItem_count', 0)
+
+    storage_analysis = doc.get('storage_analysis', {})
+    if storage_analysis:
+        potential_identifiers = storage_analysis.get('potential_identifiers', {})
+        summary['storage_potential_identifiers_count'] = potential_identifiers.get('total', 0)
+        summary['local_storage_potential_identifiers'] = potential_identifiers.get('localStorage', 0)
+        summary['session_storage_potential_identifiers'] = potential_identifiers.get('sessionStorage', 0)
+
+    return summary
+
+
+register_summary_metrics(_storage_summary, [
+    'local_storage_count', 'session_storage_count', 'local_storage_get', 'session_storage_get',
+    'storage_potential_identifiers_count', 'local_storage_potential_identifiers',
+    'session_storage_potential_identifiers'
+], sections=('storage', 'storage_analysis'))
+
+
+# Fingerprinting
+
+FINGERPRINTING_TECHNIQUES = ['hardware', 'canvas', 'webgl', 'navigator', 'screen', 'storage', 'date',
+                             'media', 'performance', 'intl']
+
+
+def _technique_breakdown(doc):
+    """Fingerprinting calls per technique for the exported visit"""
+    fingerprinting_data = doc.visit('fingerprinting')
+    if not fingerprinting_data:
+        return {}
+    technique_breakdown = fingerprinting_data.get('technique_breakdown', {})
+    if not technique_breakdown and 'domain_summary' in fingerprinting_data:
+        technique_breakdown = fingerprinting_data.get('domain_summary', {}).get('technique_breakdown', {})
+    return technique_breakdown
+
+
+register_metric('total_fingerprinting_calls', lambda doc: sum(doc.derived(_technique_breakdown).values()),
+                ('fingerprinting',))
+for _technique in FINGERPRINTING_TECHNIQUES:
+    register_metric(f'{_technique}_fingerprinting_calls',
+                    lambda doc, technique=_technique: doc.derived(_technique_breakdown).get(technique, 0),
+                    ('fingerprinting',))
+
+
+# Third-party domains
+
+register_metric('total_third_party_domains', lambda doc: len(doc.derived(_domain_summary)['third_party_domains']),
+                ('domain_analysis',))
+
+# Third-party domains per category. The original export never filled these in
+# (its per-category sets started empty), so they are kept at 0 to keep rows
+# comparable with earlier exports.
+for _prefix in ['social_media', 'advertising', 'analytics', 'consent_management', 'hosting',
+                'customer_interaction', 'audio_video', 'extensions', 'adult_advertising', 'utilities',
+                'miscellaneous', 'uncategorized']:
+    register_metric(f'{_prefix}_domains_count', lambda doc: 0)
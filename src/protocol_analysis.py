@@ -4,21 +4,49 @@ import csv
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
-from collections import defaultdict
+from utils.domain_parser import get_base_domain
+from utils.public_suffix_updater import update_public_suffix_list
 
-def extract_protocol_data(json_file):
-    """Extract protocol information from network requests in a JSON file"""
+# Scheme and netloc of a URL, matching what urlparse returns for absolute URLs
+URL_PATTERN = r'^(?P<scheme>[A-Za-z][A-Za-z0-9+.\-]*):(?://(?P<netloc>[^/?#]*))?'
+
+# Number of crawl files parsed per worker task
+FILES_PER_CHUNK = 200
+
+# Left side (browser extensions)
+BROWSER_EXTENSIONS = [
+    'no_extensions',
+    'adblock_plus',
+    'disconnect',
+    'ghostery_tracker_&_ad_blocker',
+    'privacy_badger',
+    'ublock',
+    'ublock_origin_lite'
+]
+
+# Right side (cookie/consent managers)
+COOKIE_MANAGERS = [
+    'no_extensions',
+    'consent_o_matic_opt_out',
+    'consent_o_matic_opt_in',
+    'i_dont_care_about_cookies',
+    'super_agent'
+]
+
+
+def load_request_urls(json_file):
+    """
+    Get the site domain and request URLs from a crawl file
+    
+    Returns:
+        tuple: (site domain, list of URLs), or None if the file could not be read
+    """
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        # Initialize counters for protocols
-        protocols = {'http': 0, 'https': 0}
-        domains_by_protocol = {'http': set(), 'https': set()}
-        all_third_party_domains = set()
-        
         # Get the primary domain
         site_domain = data.get('domain', '').lower()
         if not site_domain:
@@ -26,74 +54,134 @@ def extract_protocol_data(json_file):
             filename = os.path.basename(json_file)
             site_domain = filename[:-5].lower()  # Remove '.json'
         
-        # First-party domains (to exclude from third-party analysis)
-        first_party_domains = {site_domain}
-        if site_domain.startswith('www.'):
-            first_party_domains.add(site_domain[4:])
-        else:
-            first_party_domains.add(f"www.{site_domain}")
-            
         # Get requests from different possible formats
         requests = []
         
         # Format 1: network_data with visit keys
-        network_data = None
         for key in ['0', '1', 'visit0', 'visit1']:
             if key in data.get('network_data', {}):
-                network_data = data['network_data'][key]
-                requests = network_data.get('requests', [])
+                requests = data['network_data'][key].get('requests', [])
                 break
         
         # Format 2: requests directly in the root
         if not requests and 'requests' in data:
             requests = data['requests']
-            
-        # Process requests
-        for req in requests:
-            url = req.get('url', '')
-            if not url:
-                continue
-                
-            try:
-                parsed_url = urlparse(url)
-                domain = parsed_url.netloc.lower()
-                
-                # Remove www. prefix if present
-                if domain.startswith('www.'):
-                    domain = domain[4:]
-                
-                # Skip first-party requests
-                if domain in first_party_domains:
-                    continue
-                    
-                # Add to all third-party domains
-                all_third_party_domains.add(domain)
-                
-                # Count protocols
-                protocol = parsed_url.scheme
-                if protocol in ['http', 'https']:
-                    protocols[protocol] += 1
-                    domains_by_protocol[protocol].add(domain)
-            except Exception:
-                continue
-        
-        # Calculate domain counts by protocol category
-        https_only_domains = domains_by_protocol['https'] - domains_by_protocol['http']
-        http_only_domains = domains_by_protocol['http'] - domains_by_protocol['https']
-        both_protocols_domains = domains_by_protocol['https'] & domains_by_protocol['http']
         
-        return {
-            'https_only': len(https_only_domains),
-            'http_only': len(http_only_domains),
-            'http_https': len(both_protocols_domains),
-            'total_domains': len(all_third_party_domains)
-        }
+        return site_domain, [req.get('url', '') for req in requests if req.get('url', '')]
         
     except Exception as e:
         print(f"Error processing {json_file}: {e}")
         return None
 
-def analyze_protocols_by_extension(json_dir, output_dir):
+
+def _load_chunk(args):
+    """Build the deduplicated requests table for a chunk of one profile's files (runs in a worker process)"""
+    profile, files = args
+    sites = []
+    urls = []
+    for json_file in files:
+        loaded = load_request_urls(json_file)
+        if loaded:
+            site_domain, site_urls = loaded
+            sites.extend([site_domain] * len(site_urls))
+            urls.extend(site_urls)
+    
+    parts = pd.Series(urls, dtype=object).str.extract(URL_PATTERN).fillna('')
+    table = pd.DataFrame({
+        'site': sites,
+        'scheme': parts['scheme'].str.lower(),
+        # Hosts are compared without a leading www.
+        'host': parts['netloc'].str.lower().str.replace(r'^www\.', '', regex=True)
+    })
+    # Only the distinct (site, scheme, host) combinations matter for protocol shares
+    table = table.drop_duplicates()
+    table['profile'] = profile
+    return table
+
+
+def build_requests_table(json_dir, profiles, max_workers=None, public_suffixes=None):
+    """
+    Build a columnar table of the requests made in every crawl file of the given profiles
+    
+    Rows are distinct per (profile, site, scheme, host), so the table stays small
+    while still answering every protocol question with a groupby.
+    
+    Args:
+        json_dir: Directory containing one folder per profile
+        profiles: Profile folder names to include
+        max_workers: Number of worker processes for parsing the crawl files
+        public_suffixes: Public suffix set for registrable domains (loaded when None)
+        
+    Returns:
+        DataFrame with columns profile, site, scheme, host, registrable_domain and first_party
+    """
+    tasks = []
+    for profile in profiles:
+        profile_dir = os.path.join(json_dir, profile)
+        files = sorted(os.path.join(profile_dir, f) for f in os.listdir(profile_dir) if f.endswith('.json'))
+        tasks.extend((profile, files[i:i + FILES_PER_CHUNK]) for i in range(0, len(files), FILES_PER_CHUNK))
+    
+    columns = ['profile', 'site', 'scheme', 'host']
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunks = list(tqdm(executor.map(_load_chunk, tasks), total=len(tasks), desc="Loading requests"))
+    table = pd.concat(chunks, ignore_index=True)[columns] if chunks else pd.DataFrame(columns=columns)
+    
+    # Requests to the site itself (with or without www.) are first-party
+    site = table['site']
+    other_form = np.where(site.str.startswith('www.'), site.str[4:], 'www.' + site)
+    table['first_party'] = (table['host'] == site) | (table['host'] == other_form)
+    
+    # Registrable domain (e.g. example.co.uk), computed once per distinct host
+    if public_suffixes is None:
+        public_suffixes = update_public_suffix_list()
+    hosts = table['host'].unique()
+    registrable = {}
+    for host in hosts:
+        base, suffix = get_base_domain(host.split(':')[0], public_suffixes)
+        registrable[host] = f"{base}.{suffix}" if base else (suffix or '')
+    table['registrable_domain'] = table['host'].map(registrable)
+    
+    for column in ['profile', 'site', 'scheme']:
+        table[column] = table[column].astype('category')
+    return table
+
+
+def protocol_shares(table, domain_column='host'):
+    """
+    Share of distinct third-party domains per profile reached over HTTP only, HTTPS only or both
+    
+    A domain is counted once per site, so totals match summing per-site counts.
+    
+    Args:
+        table: Requests table from build_requests_table
+        domain_column: 'host' or 'registrable_domain'
+        
+    Returns:
+        DataFrame indexed by profile with https_only, http_only, http_https and
+        total_domains counts and the matching *_pct columns
+    """
+    third_party = table[~table['first_party']]
+    flags = pd.DataFrame({
+        'profile': third_party['profile'],
+        'site': third_party['site'],
+        'domain': third_party[domain_column],
+        'http': third_party['scheme'] == 'http',
+        'https': third_party['scheme'] == 'https'
+    }).groupby(['profile', 'site', 'domain'], observed=True)[['http', 'https']].any()
+    
+    counts = pd.DataFrame({
+        'https_only': flags['https'] & ~flags['http'],
+        'http_only': flags['http'] & ~flags['https'],
+        'http_https': flags['http'] & flags['https']
+    }).groupby(level='profile', observed=True).sum()
+    counts['total_domains'] = flags.groupby(level='profile', observed=True).size()
+    
+    for key in ['https_only', 'http_only', 'http_https']:
+        counts[f'{key}_pct'] = counts[key] / counts['total_domains'] * 100
+    return counts
+
+
+def analyze_protocols_by_extension(json_dir, output_dir, max_workers=None, domain_column='host'):
     """Analyze protocol usage across different browser extensions and blocklists"""
     # Make sure output directory exists
     os.makedirs(output_dir, exist_ok=True)
@@ -102,99 +190,25 @@ def analyze_protocols_by_extension(json_dir, output_dir):
     extension_dirs = [d for d in os.listdir(json_dir) 
                     if os.path.isdir(os.path.join(json_dir, d))]
     
-    # Define which profiles to include in which graph
-    # Left side (browser extensions)
-    browser_extensions = [
-        'no_extensions',
-        'adblock_plus',
-        'disconnect',
-        'ghostery_tracker_&_ad_blocker',
-        'privacy_badger',
-        'ublock',
-        'ublock_origin_lite'
-    ]
-    
-    # Right side (cookie/consent managers)
-    cookie_managers = [
-        'no_extensions',
-        'consent_o_matic_opt_out',
-        'consent_o_matic_opt_in',
-        'i_dont_care_about_cookies',
-        'super_agent'
-    ]
-    
     # Filter available dirs to match expected lists
-    available_extensions = [d for d in extension_dirs if d in browser_extensions]
-    available_managers = [d for d in extension_dirs if d in cookie_managers]
+    available_extensions = [d for d in extension_dirs if d in BROWSER_EXTENSIONS]
+    available_managers = [d for d in extension_dirs if d in COOKIE_MANAGERS and d != 'no_extensions']
     
-    # Process each extension
-    results = []
+    table = build_requests_table(json_dir, available_extensions + available_managers, max_workers)
+    shares = protocol_shares(table, domain_column)
+    shares = shares[shares['total_domains'] > 0]
     
-    # Process browser extensions
-    for ext in tqdm(available_extensions, desc="Processing browser extensions"):
-        ext_dir = os.path.join(json_dir, ext)
-        files = [os.path.join(ext_dir, f) for f in os.listdir(ext_dir) 
-                if f.endswith('.json')]
-        
-        # Aggregate results across all files for this extension
-        ext_totals = {'https_only': 0, 'http_only': 0, 'http_https': 0, 'total_domains': 0}
-        
-        for file in files:
-            data = extract_protocol_data(file)
-            if data:
-                for key in ext_totals:
-                    ext_totals[key] += data[key]
-        
-        # Calculate percentages
-        if ext_totals['total_domains'] > 0:
-            total = ext_totals['total_domains']
-            results.append({
-                'extension': ext,
-                'type': 'browser',
-                'https_only_pct': ext_totals['https_only'] / total * 100,
-                'http_only_pct': ext_totals['http_only'] / total * 100,
-                'http_https_pct': ext_totals['http_https'] / total * 100
-            })
-    
-    # Process cookie/consent managers
-    for manager in tqdm(available_managers, desc="Processing cookie/consent managers"):
-        if manager == 'no_extensions':
-            continue  # Already processed in browser extensions
-            
-        manager_dir = os.path.join(json_dir, manager)
-        files = [os.path.join(manager_dir, f) for f in os.listdir(manager_dir) 
-                if f.endswith('.json')]
-        
-        # Aggregate results across all files for this manager
-        manager_totals = {'https_only': 0, 'http_only': 0, 'http_https': 0, 'total_domains': 0}
-        
-        for file in files:
-            data = extract_protocol_data(file)
-            if data:
-                for key in manager_totals:
-                    manager_totals[key] += data[key]
-        
-        # Calculate percentages
-        if manager_totals['total_domains'] > 0:
-            total = manager_totals['total_domains']
-            results.append({
-                'extension': manager,
-                'type': 'cookie_manager',
-                'https_only_pct': manager_totals['https_only'] / total * 100,
-                'http_only_pct': manager_totals['http_only'] / total * 100,
-                'http_https_pct': manager_totals['http_https'] / total * 100
-            })
-    
-    # Add no_extensions to cookie managers as well if it exists
+    # One row per profile and graph; no_extensions is the baseline in both graphs
+    rows = [(ext, 'browser') for ext in available_extensions]
+    rows += [(manager, 'cookie_manager') for manager in available_managers]
     if 'no_extensions' in available_extensions:
-        plain_data = next((r for r in results if r['extension'] == 'no_extensions'), None)
-        if plain_data:
-            plain_cookie = plain_data.copy()
-            plain_cookie['type'] = 'cookie_manager'
-            results.append(plain_cookie)
-    
-    # Convert to DataFrame
-    results_df = pd.DataFrame(results)
+        rows.append(('no_extensions', 'cookie_manager'))
+    rows = [(ext, ext_type) for ext, ext_type in rows if ext in shares.index]
+    
+    pct_columns = ['https_only_pct', 'http_only_pct', 'http_https_pct']
+    results_df = shares.loc[[ext for ext, _ in rows], pct_columns].reset_index(drop=True)
+    results_df.insert(0, 'extension', [ext for ext, _ in rows])
+    results_df.insert(1, 'type', [ext_type for _, ext_type in rows])
     
     # Save results to CSV
     csv_file = os.path.join(output_dir, 'protocol_analysis.csv')
@@ -0,0 +1,63 @@
+import os
+import json
+import hashlib
+import tempfile
+
+
+class ContentCache:
+    """
+    Content-addressed on-disk cache of JSON results.
+
+    Entries are keyed by a hash of the input bytes plus a config string, so
+    renamed or re-crawled files with identical content are never processed twice.
+    Each entry is stored as its own small JSON file, which keeps concurrent writes
+    from multiple worker processes safe.
+    """
+
+    # Bump in subclasses when the stored result format changes to invalidate old entries
+    version = 1
+
+    def __init__(self, cache_dir):
+        """Initialize the cache rooted at cache_dir"""
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def make_key(cls, content_bytes, config=''):
+        """Build the cache key from the input content and processing configuration"""
+        digest = hashlib.sha256(content_bytes)
+        digest.update(f"|{config}|v{cls.version}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        """Get the file path for a cache key (sharded by the first two hex digits)"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key, or None if not cached"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            self.hits += 1
+            return result
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        """Store a result atomically"""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -1,3 +1,5 @@
+import re
+
 # Cookie-related keywords for both HTML and screenshot analysis
 COOKIE_KEYWORDS = [
     "cookie", "consent", "accept", "reject", "decline", 
@@ -5,4 +7,72 @@ COOKIE_KEYWORDS = [
     "necessary", "functional", "analytics", "marketing",
     "all", "afslå", "acceptér", "alle", "cookies",
     "luk", "acceptér", "policy", "approve", "accepterer"
-] 
\ No newline at end of file
+]
+
+# Substrings of ids/classes used by common consent management platforms
+CMP_HINTS = [
+    "onetrust", "cookiebot", "cybotcookiebot", "didomi", "qc-cmp", "usercentrics",
+    "truste", "sp_message", "cookieconsent", "cookie-consent", "cookie-banner",
+    "cookie_banner", "cookienotice", "cookie-notice", "cc-window", "gdpr", "consent"
+]
+
+
+class KeywordMatcher:
+    """
+    Finds whole-word, case-insensitive keyword hits in a single scan.
+    
+    Equivalent to running re.search(r'\\b' + re.escape(kw) + r'\\b', text, re.IGNORECASE)
+    per keyword, but all single-word keywords share one compiled alternation so the
+    text is scanned once instead of once per keyword.
+    """
+    
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        unique = sorted({kw.lower() for kw in self.keywords}, key=len, reverse=True)
+        
+        # Two single-word keywords can never both match at the same position with
+        # word boundaries on both sides, so one non-overlapping scan finds every hit
+        self._simple = {kw for kw in unique if re.fullmatch(r'\w+', kw)}
+        self._pattern = None
+        if self._simple:
+            alternation = '|'.join(re.escape(kw) for kw in unique if kw in self._simple)
+            self._pattern = re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+        
+        # Multi-word keywords (if any) keep their own pattern
+        self._complex = {
+            kw: re.compile(r'\b' + re.escape(kw) + r'\b', re.IGNORECASE)
+            for kw in unique if kw not in self._simple
+        }
+    
+    def find_all(self, text, candidates=None):
+        """
+        Find the keywords that occur in text
+        
+        Args:
+            text: Text to search
+            candidates: Optional subset of keywords to look for (defaults to all)
+            
+        Returns:
+            list: Matching keywords in the order given by candidates/keywords
+        """
+        candidates = self.keywords if candidates is None else candidates
+        targets = {kw.lower() for kw in candidates}
+        hits = set()
+        
+        wanted_simple = targets & self._simple
+        if wanted_simple:
+            for match in self._pattern.finditer(text):
+                hits.add(match.group(0).lower())
+                # Stop as soon as every keyword we care about has been seen
+                if wanted_simple <= hits:
+                    break
+        
+        for kw, pattern in self._complex.items():
+            if kw in targets and pattern.search(text):
+                hits.add(kw)
+        
+        return [kw for kw in candidates if kw.lower() in hits]
+
+
+# Shared matcher, compiled once per process
+COOKIE_KEYWORD_MATCHER = KeywordMatcher(COOKIE_KEYWORDS)
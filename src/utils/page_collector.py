@@ -2,7 +2,6 @@ import asyncio
 import json
 import os
 import csv
-from urllib.parse import urlparse
 from collections import deque
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
@@ -11,8 +10,10 @@ from tqdm import tqdm
 
 if __name__ == "__main__":
     from util import construct_paths, load_config, get_profile_config
+    from urlkit import url_netloc
 else:
     from utils.util import construct_paths, load_config, get_profile_config
+    from utils.urlkit import url_netloc
 
 class PageCollector:
     def __init__(self, base_domain, verbose=False):
@@ -32,16 +33,11 @@ class PageCollector:
         """Check if URL belongs to the same domain"""
         if not url:
             return False
-        try:
-            parsed = urlparse(url)
-            # Strip 'www.' from the netloc for comparison
-            domain = parsed.netloc.lower().replace('www.', '')
-            
-            # Check if it's the same domain OR if it's a subdomain
-            return domain == self.base_domain or domain.endswith('.' + self.base_domain)
-        except Exception as e:
-            tqdm.write(f"Error parsing URL {url}: {e}")
-            return False
+        # Strip 'www.' from the netloc for comparison
+        domain = url_netloc(url).lower().replace('www.', '')
+        
+        # Check if it's the same domain OR if it's a subdomain
+        return domain == self.base_domain or domain.endswith('.' + self.base_domain)
 
     async def extract_links(self, page):
         """Extract all links from the current page"""
@@ -151,8 +147,7 @@ class PageCollector:
                 
                 # Update the base domain based on the final URL after redirect
                 final_url = page.url
-                parsed_final = urlparse(final_url)
-                final_domain = parsed_final.netloc.lower().replace('www.', '')
+                final_domain = url_netloc(final_url).lower().replace('www.', '')
                 
                 if final_domain != self.base_domain:
                     tqdm.write(f"Detected redirect: {self.base_domain} -> {final_domain}")
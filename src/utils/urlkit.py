@@ -0,0 +1,129 @@
+import sys
+from functools import lru_cache
+from urllib.parse import urlparse, uses_params
+
+# Number of distinct authorities / schemes / hosts kept in the caches
+AUTHORITY_CACHE_SIZE = 16384
+HOST_CACHE_SIZE = 16384
+
+_SCHEME_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+-.')
+_PARAM_SCHEMES = frozenset(uses_params)
+
+
+@lru_cache(maxsize=64)
+def _scheme(scheme):
+    """Lowercased scheme, or None if urlparse would not read it as a scheme"""
+    if scheme[0].isalpha() and all(c in _SCHEME_CHARS for c in scheme):
+        return scheme.lower()
+    return None
+
+
+@lru_cache(maxsize=AUTHORITY_CACHE_SIZE)
+def _authority(netloc):
+    """
+    Shared (interned) netloc string, or None if it needs urlparse's checks
+
+    Bracketed IPv6 hosts and non-ASCII hosts are validated by urlparse instead.
+    """
+    if not netloc.isascii() or '[' in netloc or ']' in netloc:
+        return None
+    return sys.intern(netloc)
+
+
+def _fast_split(url):
+    """Split scheme://authority/path URLs with string operations, or return None"""
+    i = url.find('://')
+    if i <= 0 or url[0] <= ' ' or '\t' in url or '\n' in url or '\r' in url:
+        return None
+    scheme = _scheme(url[:i])
+    if scheme is None:
+        return None
+
+    start = i + 3
+    end = len(url)
+    for sep in '/?#':
+        j = url.find(sep, start, end)
+        if j != -1:
+            end = j
+    netloc = _authority(url[start:end])
+    if netloc is None:
+        return None
+
+    path_end = len(url)
+    for sep in '?#':
+        j = url.find(sep, end, path_end)
+        if j != -1:
+            path_end = j
+    path = url[end:path_end]
+    # urlparse moves ;params of the last path segment out of the path
+    if ';' in path and scheme in _PARAM_SCHEMES:
+        j = path.find(';', path.rfind('/'))
+        if j != -1:
+            path = path[:j]
+    return scheme, netloc, path
+
+
+def split_url(url):
+    """
+    Split a URL into (scheme, netloc, path)
+
+    Same parts as urlparse. Ordinary scheme://host/path URLs are split with string
+    operations (their authority checked once per distinct authority), anything
+    unusual goes through urlparse. URLs urlparse rejects (e.g. broken IPv6 hosts)
+    fall back to a plain split on '/', with an empty scheme and path.
+    """
+    parts = _fast_split(url)
+    if parts is not None:
+        return parts
+    try:
+        parsed = urlparse(url)
+        return parsed.scheme, parsed.netloc, parsed.path
+    except ValueError:
+        return '', url.split('/')[2] if '://' in url else url.split('/')[0], ''
+
+
+def url_netloc(url):
+    """Get the netloc (host and port) of a URL"""
+    return split_url(url)[1]
+
+
+def url_origin(url):
+    """Get scheme://netloc of a URL"""
+    scheme, netloc, _ = split_url(url)
+    return f"{scheme}://{netloc}"
+
+
+def url_without_query(url):
+    """Get scheme://netloc/path of a URL, dropping parameters, query and fragment"""
+    scheme, netloc, path = split_url(url)
+    return f"{scheme}://{netloc}{path}"
+
+
+@lru_cache(maxsize=HOST_CACHE_SIZE)
+def base_domain(host):
+    """Get the last two labels of a host (example.com from sub.example.com)"""
+    parts = host.split('.')
+    if len(parts) > 2:
+        return '.'.join(parts[-2:])
+    return host
+
+
+def split_urls(urls):
+    """Split a list of URLs, see split_url"""
+    return [split_url(url) for url in urls]
+
+
+def url_netlocs(urls):
+    """Get the netloc of every URL in a list"""
+    return [split_url(url)[1] for url in urls]
+
+
+def url_origins(urls):
+    """Get scheme://netloc of every URL in a list"""
+    return [url_origin(url) for url in urls]
+
+
+def clear_caches():
+    """Empty the authority and host caches, e.g. between crawls"""
+    _authority.cache_clear()
+    base_domain.cache_clear()
@@ -0,0 +1,48 @@
+import unittest
+import sys
+sys.path.append('.')
+from src.export_metrics import CrawlDocument, METRICS, compute_row, required_sections, resolve_columns
+
+class TestExportMetrics(unittest.TestCase):
+    
+    def setUp(self):
+        self.data = {
+            'domain': 'example.com',
+            'domain_analysis': {
+                'domains': [
+                    {'domain': 'example.com', 'request_count': 5, 'categories': [], 'is_first_party_domain': True},
+                    {'domain': 'ads.net', 'request_count': 3, 'categories': ['Advertising'], 'filter_match': True},
+                    {'domain': 'odd.org', 'request_count': 2, 'categories': ['Odd']}
+                ]
+            },
+            'cookies': {'1': [{'secure': True, 'httpOnly': False}]},
+            'cookie_analysis': {'unique_cookies': 1, 'categories': {'Unknown': 1}}
+        }
+        self.doc = CrawlDocument('data/crawler_data/test/example.com.json', self.data)
+    
+    def test_full_row(self):
+        """Test that every registered metric is computed in column order"""
+        row = compute_row(self.doc)
+        self.assertEqual(list(row), list(METRICS))
+        self.assertEqual(row['profile'], 'test')
+        self.assertEqual(row['total_requests'], 10)
+        self.assertEqual(row['first_party_requests'], 5)
+        self.assertEqual(row['third_party_requests'], 5)
+        self.assertEqual(row['filter_match_requests'], 3)
+        self.assertEqual(row['advertising_domains'], 1)
+        self.assertEqual(row['uncategorized_domains'], 2)
+        self.assertEqual(row['secure_cookies'], 1)
+        self.assertEqual(row['unknown_cookies'], 1)
+        self.assertEqual(row['total_third_party_domains'], 2)
+        self.assertEqual(self.doc.unmatched_categories, {'Odd'})
+    
+    def test_selected_columns(self):
+        """Test that only the requested metrics and their sections are used"""
+        columns = ['unique_cookies', 'domain']
+        self.assertEqual(required_sections(columns), {'domain', 'cookie_analysis', 'cookies'})
+        self.assertEqual(compute_row(self.doc, columns), {'domain': 'example.com', 'unique_cookies': 1})
+        with self.assertRaises(ValueError):
+            resolve_columns(['no_such_metric'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+import sys
+sys.path.append('.')
+from src.crawler.monitors.init_scripts import InitScriptRegistry, render_bundle, load_script
+
+class FakeContext:
+    """Records what is installed on a browser context"""
+
+    def __init__(self):
+        self.bindings = []
+        self.scripts = []
+
+    async def expose_function(self, name, callback):
+        if name in self.bindings:
+            raise RuntimeError(f"Function \"{name}\" has been already registered")
+        self.bindings.append(name)
+
+    async def add_init_script(self, script):
+        self.scripts.append(script)
+
+class TestInitScripts(unittest.TestCase):
+
+    def test_bundle_config(self):
+        """Test that the bundle is parameterized with the config object"""
+        bundle = render_bundle({'storage': {'push': True}})
+        self.assertTrue(bundle.endswith('({"storage": {"push": true}});'))
+        self.assertIn(load_script('storage'), bundle)
+        self.assertNotIn('// Storage API monitor', bundle)
+
+    def test_install_once_per_context(self):
+        """Test that a reused context gets each script and binding only once"""
+        context = FakeContext()
+        for _ in range(2):
+            scripts = InitScriptRegistry()
+            scripts.add_script('fingerprint')
+            scripts.add_script('storage', {'push': False})
+            scripts.add_binding('reportFPCall', print)
+            asyncio.run(scripts.install(context))
+
+        self.assertEqual(context.bindings, ['reportFPCall'])
+        self.assertEqual(len(context.scripts), 1)
+
+    def test_visit_stamp(self):
+        """Test that every visit sets its number for new documents on a reused context"""
+        context = FakeContext()
+        for visit in range(2):
+            scripts = InitScriptRegistry()
+            scripts.add_script('fingerprint')
+            asyncio.run(scripts.install(context, visit))
+
+        stamps = [script for script in context.scripts if script.startswith('window.__monitorVisit')]
+        self.assertEqual(stamps, ['window.__monitorVisit = 0;', 'window.__monitorVisit = 1;'])
+        self.assertEqual(len(context.scripts), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append('src')
+
+try:
+    import pyarrow.parquet as pq
+    from json_to_csv import RowWriter
+except ImportError:
+    pq = None
+
+@unittest.skipIf(pq is None, "Parquet output needs pyarrow (and the exporter's dependencies)")
+class TestRowWriterParquet(unittest.TestCase):
+
+    def _write(self, rows, column_types=None):
+        """Write rows in batches of 2 and read the table back"""
+        path = os.path.join(tempfile.mkdtemp(), 'rows.parquet')
+        writer = RowWriter(path, 'parquet', batch_size=2, column_types=column_types)
+        for row in rows:
+            writer.write(row)
+        writer.close()
+        return pq.read_table(path)
+
+    def test_registry_types(self):
+        """Test that registered columns keep their type when the first batch is all None"""
+        rows = [{'rank': None, 'domain': None}] * 2 + [{'rank': 7, 'domain': 'example.com'}]
+        table = self._write(rows, {'rank': 'int', 'domain': 'str'})
+        self.assertEqual(str(table.schema.field('rank').type), 'int64')
+        self.assertEqual(table.column('rank').to_pylist(), [None, None, 7])
+        self.assertEqual(table.column('domain').to_pylist(), [None, None, 'example.com'])
+
+    def test_fallback_types(self):
+        """Test null-then-int and int-then-float columns the registry doesn't know"""
+        rows = [{'a': None, 'b': 1}, {'a': None, 'b': 2}, {'a': 3, 'b': 1.5}]
+        table = self._write(rows)
+        self.assertEqual(table.column('a').to_pylist(), [None, None, '3'])
+        self.assertEqual(str(table.schema.field('b').type), 'double')
+        self.assertEqual(table.column('b').to_pylist(), [1.0, 2.0, 1.5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import re
+import sys
+sys.path.append('.')
+from src.utils.keywords import COOKIE_KEYWORDS, KeywordMatcher
+
+class TestKeywordMatcher(unittest.TestCase):
+    
+    def setUp(self):
+        self.matcher = KeywordMatcher(COOKIE_KEYWORDS)
+    
+    def test_matches_per_keyword_search(self):
+        """Test that one scan gives the same hits as a regex search per keyword"""
+        test_texts = [
+            "We use cookies. Accept all or reject",
+            "<div id='cookie-banner'>Acceptér alle</div>",
+            "COOKIE SETTINGS and Privacy Policy",
+            "cookiesettings acceptall marketing_tools",
+            "Vi accepterer ikke. Luk",
+            ""
+        ]
+        
+        for text in test_texts:
+            expected = [kw for kw in COOKIE_KEYWORDS
+                        if re.search(r'\b' + re.escape(kw) + r'\b', text, re.IGNORECASE)]
+            self.assertEqual(self.matcher.find_all(text), expected, f"Failed for '{text}'")
+    
+    def test_candidates(self):
+        """Test that only the requested candidates are returned, in their order"""
+        text = "Accept cookies or change settings"
+        self.assertEqual(
+            self.matcher.find_all(text, candidates=["settings", "reject", "cookies"]),
+            ["settings", "cookies"]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import asyncio
+import unittest
+import sys
+sys.path.append('.')
+from src.crawler.page_readiness import LoadProfile, PageReadiness
+
+class FakeMonitor:
+    """Network monitor that went quiet long ago"""
+
+    def quiet_for(self, max_inflight=0):
+        return 60.0
+
+class FakePage:
+    async def evaluate(self, script, arg):
+        return 'quiet'
+
+class TestPageReadiness(unittest.TestCase):
+
+    def test_learned_budget(self):
+        """Test that the budget follows earlier ready times within its bounds"""
+        profile = LoadProfile()
+        self.assertEqual(profile.budget_ms(4000, 1000, 4000), 4000)
+        for ready_ms in (800, 900, 1200, 1000):
+            profile.add(ready_ms)
+        self.assertEqual(profile.budget_ms(4000, 1000, 4000), 1250)
+        profile.add(10000)
+        self.assertEqual(profile.budget_ms(4000, 1000, 4000), 1500)
+        for _ in range(20):
+            profile.add(10000)
+        self.assertEqual(profile.budget_ms(4000, 1000, 4000), 4000)
+
+    def test_quiet_page(self):
+        """Test that a quiet page is ready without waiting for the budget"""
+        readiness = PageReadiness(network_monitor=FakeMonitor())
+        entry = asyncio.run(readiness.wait_until_ready(FakePage(), 'example.com', 'no_extension', 'https://example.com/', 0))
+        self.assertEqual((entry['dom'], entry['network']), ('quiet', 'quiet'))
+        self.assertLess(entry['ready_ms'], 1000)
+        self.assertEqual(readiness.get_summary()['pages'], [entry])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+from urllib.parse import urlparse
+sys.path.append('.')
+from src.utils.urlkit import split_url, url_origin, url_without_query, base_domain, url_netlocs, _authority, clear_caches
+
+class TestUrlkit(unittest.TestCase):
+    
+    def test_matches_urlparse(self):
+        """Test that the cached splitter gives the same parts as urlparse"""
+        urls = [
+            "https://www.example.com/path/page.html?x=1#top",
+            "http://cdn.example.co.uk:8080/a;params?q",
+            "data:image/png;base64,AAAA",
+            "//example.com/relative",
+            ""
+        ]
+        for url in urls:
+            parsed = urlparse(url)
+            self.assertEqual(split_url(url), (parsed.scheme, parsed.netloc, parsed.path))
+            self.assertEqual(url_origin(url), f"{parsed.scheme}://{parsed.netloc}")
+            self.assertEqual(url_without_query(url), f"{parsed.scheme}://{parsed.netloc}{parsed.path}")
+        self.assertEqual(url_netlocs(urls[:2]), ["www.example.com", "cdn.example.co.uk:8080"])
+    
+    def test_fast_and_fallback_paths(self):
+        """Test that plain URLs are split without urlparse and unusual ones with it"""
+        clear_caches()
+        fast = ["HTTPS://Example.com:443/a/b;p?q#f", "http://example.com?x=1", "ftp://u:p@host/file;type=i"]
+        fallback = ["data:text/plain,hi", "//example.com/x", " http://example.com/", "http://[::1]:8080/x",
+                    "https://bücher.de/", "/path?next=http://example.com"]
+        for url in fast + fallback:
+            parsed = urlparse(url)
+            self.assertEqual(split_url(url), (parsed.scheme, parsed.netloc, parsed.path))
+        
+        # Only the fast path caches authorities; the IPv6 and non-ASCII hosts are checked and rejected
+        self.assertEqual(_authority.cache_info().currsize, len(fast) + 2)
+        self.assertIsNone(_authority("[::1]:8080"))
+        self.assertIs(split_url("http://example.com?a")[1], split_url("http://example.com/b")[1])
+    
+    def test_invalid_url(self):
+        """Test that URLs urlparse rejects fall back to a plain split"""
+        self.assertEqual(split_url("http://[::1/path"), ('', '[::1', ''))
+    
+    def test_base_domain(self):
+        """Test base domain extraction from hosts"""
+        self.assertEqual(base_domain("sub.example.com"), "example.com")
+        self.assertEqual(base_domain("example.com"), "example.com")
+
+if __name__ == '__main__':
+    unittest.main()